@@ -1,5 +1,7 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html as lxml_html
 from urllib.parse import quote_plus
 import csv
 import time
@@ -8,6 +10,15 @@ import sys
 import os
 from dotenv import load_dotenv
 import re
+import hashlib
+import sqlite3
+import zlib
+import mmap
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # Selenium imports
 try:
@@ -23,6 +34,24 @@ except ImportError:
     SELENIUM_AVAILABLE = False
     print("⚠️  Selenium not available. Install with: pip install selenium webdriver-manager")
 
+# Optional Redis cache for category descriptions
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Optional faster JSON parser for Gemini responses
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_loads(data):
+    """Parse JSON bytes/str with orjson when installed, stdlib json otherwise"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
 load_dotenv()
 # Gemini AI configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -36,6 +65,78 @@ if not GEMINI_ENDPOINT.endswith('/'):
     GEMINI_ENDPOINT += '/'
 GEMINI_BASE_URL = f"{GEMINI_ENDPOINT}gemini-2.0-flash-exp:generateContent"
 
+# Shared keep-alive session for Gemini requests, retrying rate limits and server errors
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=None)
+))
+GEMINI_TIMEOUT = (3.05, 30)
+
+# Category descriptions are cached in Redis (when REDIS_URL is set), otherwise
+# in the scrape cache database, so repeated runs over the same keywords skip
+# the Gemini round trip
+DESCRIPTION_CACHE_TTL = 30 * 86400
+REDIS_URL = os.getenv('REDIS_URL')
+redis_client = None
+if REDIS_AVAILABLE and REDIS_URL:
+    try:
+        redis_client = redis.Redis.from_url(REDIS_URL)
+        redis_client.ping()
+    except Exception as e:
+        print(f"⚠️  Redis unavailable ({e}), caching descriptions in the local scrape cache")
+        redis_client = None
+
+# Rendered search pages are cached on disk so repeated runs skip the browser
+SCRAPE_CACHE_PATH = os.getenv('SCRAPE_CACHE_PATH', 'scrape_cache.db')
+SCRAPE_CACHE_TTL = int(os.getenv('SCRAPE_CACHE_TTL', 6 * 3600))
+
+# XPath expressions used to parse search result pages
+_PRODUCT_LINKS_XPATH = etree.XPath('.//a[contains(@href, "/item/")]')
+# Nearest ancestor that is a product card, e.g. div[class*="multi--container"]
+_PRODUCT_CARD_XPATH = etree.XPath(
+    'ancestor::*[@data-productid or contains(@class, "container") '
+    'or contains(@class, "product-card") or contains(@class, "multi--")][1]'
+)
+# Fallback when no card wrapper is found: the ancestor 5 levels above the link
+_CONTAINER_XPATH = etree.XPath('ancestor::*[position() <= 5][last()]')
+_TITLE_CANDIDATES_XPATH = etree.XPath('(.//h1 | .//h2 | .//h3 | .//h4 | .//span | .//div)[position() <= 10]')
+_FIRST_IMG_XPATH = etree.XPath('(.//img)[1]')
+
+# First price-looking string in a product container ($, US $, €, £ or trailing $)
+_PRICE_RE = re.compile(r'(?:US\s*)?[\$€£]\s*[\d,]+\.?\d*|[\d,]+\.?\d*\s*\$', re.IGNORECASE)
+_ITEM_ID_RE = re.compile(r'/item/(\d+)')
+_PRICE_CHARS_RE = re.compile(r'[^\d.,]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_TOKEN_RE = re.compile(r'\w+')
+
+# Subresources Chrome never needs to fetch for scraping. Images are blocked too:
+# thumbnails are read from the img src/data-src attributes, not the image itself
+_BLOCKED_URL_PATTERNS = [
+    '*google-analytics*', '*googletagmanager*', '*doubleclick*', '*hotjar*',
+    '*.woff*', '*.ttf', '*.mp4', '*.gif', '*.jpg', '*.jpeg', '*.png', '*.webp',
+]
+
+# Server-rendered search pages embed the result list as JSON in one of these globals
+_INLINE_DATA_RE = re.compile(r'window\.(?:_dida_config_|runParams)\s*=\s*')
+_HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Upgrade-Insecure-Requests': '1',
+}
+# Cache key prefix recording that plain HTTP was blocked for a URL
+_HTTP_BLOCKED_PREFIX = 'http-blocked:'
+
+# Number of Chrome sessions searching keywords in parallel
+SCRAPER_WORKERS = int(os.getenv('SCRAPER_WORKERS', 4))
+
 def check_keywords_file():
     """Check if Keywords.csv exists in the current directory"""
     if not os.path.exists('Keywords.csv'):
@@ -44,9 +145,54 @@ def check_keywords_file():
         sys.exit(1)
     return True
 
-def generate_category_descriptions(category):
+def read_keywords(path='Keywords.csv'):
+    """
+    Return the first column of every non-empty row after the header,
+    reading the file through mmap in one pass
+    """
+    with open(path, 'rb') as file:
+        try:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = mm[:].decode('utf-8-sig')
+        except ValueError:
+            # mmap cannot map an empty file
+            return []
+    
+    keywords = []
+    for line in data.splitlines()[1:]:
+        if line.startswith('"'):
+            # Quoted value, possibly containing commas
+            keyword = next(csv.reader([line]))[0]
+        else:
+            keyword = line.split(',', 1)[0]
+        keyword = keyword.strip()
+        if keyword:
+            keywords.append(keyword)
+    return keywords
+
+OUTPUT_FIELDS = ('Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description')
+
+def load_seen_titles(path='output.csv'):
+    """Return the titles already written to an existing output file"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader, None)  # header
+        return {row[1] for row in reader if len(row) > 1}
+
+def normalize_keyword(keyword):
+    """Key under which differently typed copies of the same query are merged"""
+    return _WHITESPACE_RE.sub(' ', keyword.strip().lower())
+
+def _fallback_descriptions(category):
+    """Default descriptions used when Gemini is unavailable"""
+    return f"Quality {category} products", f"Discover our selection of {category} products with competitive prices and excellent quality"
+
+def _request_category_descriptions(category):
     """
     Generate short description and full description for a category using Gemini AI
+    Returns None if the request failed or either description is missing
     """
     headers = {
         'Content-Type': 'application/json',
@@ -74,9 +220,9 @@ Make the descriptions engaging and suitable for an e-commerce website."""
     }
 
     try:
-        response = requests.post(GEMINI_BASE_URL, headers=headers, json=data)
+        response = _SESSION.post(GEMINI_BASE_URL, headers=headers, json=data, timeout=GEMINI_TIMEOUT)
         if response.status_code == 200:
-            result = response.json()
+            result = _json_loads(response.content)
             if 'candidates' in result and result['candidates']:
                 content = result['candidates'][0].get('content', {})
                 if 'parts' in content and content['parts']:
@@ -93,13 +239,222 @@ Make the descriptions engaging and suitable for an e-commerce website."""
                         elif line.startswith('FULL:'):
                             full_desc = line.replace('FULL:', '').strip()
                     
-                    return short_desc, full_desc
+                    # A reply in another format would cache empty descriptions
+                    if short_desc and full_desc:
+                        return short_desc, full_desc
+                    print("Gemini reply had no SHORT:/FULL: descriptions")
         else:
             print(f"Gemini API error: {response.status_code}")
     except Exception as e:
         print(f"Error generating descriptions: {e}")
     
-    return f"Quality {category} products", f"Discover our selection of {category} products with competitive prices and excellent quality"
+    return None
+
+@lru_cache(maxsize=512)
+def _memory_cached_descriptions(category):
+    """In-process cache used when neither Redis nor the SQLite store is usable"""
+    return _request_category_descriptions(category) or _fallback_descriptions(category)
+
+def _description_cache_key(category):
+    """Cache key covering the model endpoint and category"""
+    return "gemini:" + hashlib.sha256(f"{GEMINI_BASE_URL}|{category}".encode()).hexdigest()
+
+class DescriptionCache:
+    """SQLite stand-in for Redis (get/setex) keeping descriptions in the scrape cache database"""
+    def __init__(self, path=SCRAPE_CACHE_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS description_cache (key TEXT PRIMARY KEY, value TEXT, expires_at INTEGER)"
+        )
+        self.conn.commit()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value FROM description_cache WHERE key = ? AND expires_at > ?",
+                (key, int(time.time()))
+            ).fetchone()
+        return row[0] if row else None
+
+    def setex(self, key, ttl, value):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO description_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, int(time.time() + ttl))
+            )
+            self.conn.commit()
+
+_sqlite_description_cache = None
+
+def _description_store():
+    """Redis when configured, else the SQLite DescriptionCache (opened on first use); None if neither works"""
+    global _sqlite_description_cache
+    if redis_client is not None:
+        return redis_client
+    if _sqlite_description_cache is None:
+        try:
+            _sqlite_description_cache = DescriptionCache()
+        except sqlite3.Error as e:
+            print(f"⚠️  Description cache unavailable ({e}), caching descriptions in memory only")
+            _sqlite_description_cache = False
+    return _sqlite_description_cache or None
+
+def generate_category_descriptions(category):
+    """
+    Return (short, full) descriptions for a category, using the cache when possible
+    """
+    if category in _batch_descriptions:
+        return _batch_descriptions[category]
+    store = _description_store()
+    if store is None:
+        return _memory_cached_descriptions(category)
+    
+    key = _description_cache_key(category)
+    try:
+        cached = store.get(key)
+        if cached:
+            short_desc, full_desc = _json_loads(cached)
+            return short_desc, full_desc
+    except Exception as e:
+        print(f"Description cache read failed ({e}), using in-memory cache")
+        return _memory_cached_descriptions(category)
+    
+    descriptions = _request_category_descriptions(category)
+    if descriptions is None:
+        return _fallback_descriptions(category)
+    
+    try:
+        store.setex(key, DESCRIPTION_CACHE_TTL, json.dumps(list(descriptions)))
+    except Exception as e:
+        print(f"Description cache write failed: {e}")
+    
+    return descriptions
+
+def _request_batch_descriptions(categories):
+    """
+    Generate descriptions for several categories with a single Gemini request
+    Returns {category: (short, full)} or None if the request failed
+    """
+    headers = {
+        'Content-Type': 'application/json',
+        'x-goog-api-key': GEMINI_API_KEY
+    }
+
+    category_list = '\n'.join(f"- {category}" for category in categories)
+    prompt = f"""You're a woocommerce store owner writing concise yet informative descriptions for product categories.
+
+For each category below write:
+1. A short description (maximum 20 words)
+2. A full description (maximum 50 words)
+
+Format your response as three lines per category:
+CAT: [category name exactly as given]
+SHORT: [your short description]
+FULL: [your full description]
+
+Make the descriptions engaging and suitable for an e-commerce website.
+
+Categories:
+{category_list}"""
+
+    data = {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }]
+    }
+
+    try:
+        response = _SESSION.post(GEMINI_BASE_URL, headers=headers, json=data, timeout=GEMINI_TIMEOUT)
+        if response.status_code != 200:
+            print(f"Gemini API error: {response.status_code}")
+            return None
+        
+        result = _json_loads(response.content)
+        text = result['candidates'][0]['content']['parts'][0].get('text', '')
+    except Exception as e:
+        print(f"Error generating batch descriptions: {e}")
+        return None
+    
+    # Group consecutive SHORT:/FULL: lines under the preceding CAT: line
+    by_name = {category.lower(): category for category in categories}
+    parsed = {}
+    current = None
+    for line in text.strip().split('\n'):
+        line = line.strip()
+        if line.startswith('CAT:'):
+            current = by_name.get(line[4:].strip().lower())
+            if current:
+                parsed[current] = {}
+        elif current and line.startswith('SHORT:'):
+            parsed[current]['short'] = line[6:].strip()
+        elif current and line.startswith('FULL:'):
+            parsed[current]['full'] = line[5:].strip()
+    
+    return {
+        category: (desc['short'], desc['full'])
+        for category, desc in parsed.items()
+        if desc.get('short') and desc.get('full')
+    }
+
+# Descriptions generated by batch requests during this run
+_batch_descriptions = {}
+
+def _cached_descriptions(category):
+    """Return cached (short, full) descriptions without calling Gemini"""
+    if category in _batch_descriptions:
+        return _batch_descriptions[category]
+    store = _description_store()
+    if store is None:
+        return None
+    try:
+        cached = store.get(_description_cache_key(category))
+        if cached:
+            short_desc, full_desc = _json_loads(cached)
+            return short_desc, full_desc
+    except Exception as e:
+        print(f"Description cache read failed: {e}")
+    return None
+
+def generate_category_descriptions_batch(categories):
+    """
+    Return {category: (short, full)} for all categories using one Gemini request
+    for everything that isn't cached yet
+    """
+    descriptions = {}
+    pending = []
+    for category in dict.fromkeys(categories):
+        cached = _cached_descriptions(category)
+        if cached:
+            descriptions[category] = cached
+        else:
+            pending.append(category)
+    
+    if not pending:
+        return descriptions
+    
+    print(f"Generating descriptions for {len(pending)} categories")
+    batch = _request_batch_descriptions(pending) or {}
+    for category in pending:
+        if category not in batch:
+            # Missing or malformed in the batch response, ask for it on its own
+            descriptions[category] = generate_category_descriptions(category)
+            continue
+        
+        descriptions[category] = batch[category]
+        _batch_descriptions[category] = batch[category]
+        store = _description_store()
+        if store is not None:
+            try:
+                store.setex(_description_cache_key(category), DESCRIPTION_CACHE_TTL,
+                            json.dumps(list(batch[category])))
+            except Exception as e:
+                print(f"Description cache write failed: {e}")
+    
+    return descriptions
+
 
 def clean_price(price_str, price_multiplier):
     """
@@ -114,7 +469,7 @@ def clean_price(price_str, price_multiplier):
         
         # Handle various currency formats and extract numbers
         # Remove currency symbols and text
-        price_clean = re.sub(r'[^\d.,]', '', price_str)
+        price_clean = _PRICE_CHARS_RE.sub('', price_str)
         
         if not price_clean:
             return "0.00"
@@ -144,14 +499,86 @@ def clean_price(price_str, price_multiplier):
         print(f"Error processing price {price_str}: {e}")
         return "0.00"
 
+def clean_prices(prices, price_multiplier):
+    """
+    clean_price over a keyword's batch of price strings
+    """
+    return [clean_price(price, price_multiplier) for price in prices]
+
+def _find_item_list(data, depth=0):
+    """Return the mods.itemList.content list from inline page data"""
+    if depth > 8:
+        return None
+    if isinstance(data, dict):
+        item_list = data.get('itemList')
+        if isinstance(item_list, dict) and isinstance(item_list.get('content'), list):
+            return item_list['content']
+        values = data.values()
+    elif isinstance(data, list):
+        values = data
+    else:
+        return None
+    for value in values:
+        if isinstance(value, (dict, list)):
+            found = _find_item_list(value, depth + 1)
+            if found is not None:
+                return found
+    return None
+
+class PageCache:
+    """SQLite cache of rendered search page HTML, keyed by URL"""
+    def __init__(self, path=SCRAPE_CACHE_PATH, ttl=SCRAPE_CACHE_TTL):
+        self.ttl = ttl
+        # Shared by the worker threads in main(), so serialize access
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_cache (url TEXT PRIMARY KEY, html BLOB, fetched_at INTEGER)"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        """Return cached HTML for url if it is younger than the TTL"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT html FROM scrape_cache WHERE url = ? AND fetched_at > ?",
+                (url, int(time.time() - self.ttl))
+            ).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def set(self, url, html):
+        data = zlib.compress(html.encode('utf-8'))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache (url, html, fetched_at) VALUES (?, ?, ?)",
+                (url, data, int(time.time()))
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
 class AliExpressFixedScraper:
-    def __init__(self):
+    def __init__(self, cache=None):
         self.driver = None
+        self.cache = cache
         # Use proper search URLs that actually work
         self.search_urls = [
             "https://www.aliexpress.com/wholesale?SearchText={}",
             "https://www.aliexpress.com/af/{}.html",
         ]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Quit the browser session shared by all searches"""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
         
     def setup_driver(self, headless=True):
         """Setup Chrome WebDriver with proper options"""
@@ -186,97 +613,179 @@ class AliExpressFixedScraper:
                 "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             })
             
+            # Drop trackers, fonts and media before they are requested
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': _BLOCKED_URL_PATTERNS})
+            
             return True
         except Exception as e:
             print(f"❌ Chrome WebDriver setup failed: {e}")
             return False
 
     def search(self, query, max_results_per_keyword):
-        """Search for products using enhanced Selenium approach"""
-        if not self.setup_driver(headless=True):
-            print("❌ Cannot initialize WebDriver")
-            return []
-        
+        """Search for products over plain HTTP, falling back to Selenium"""
         all_items = []
         
-        try:
-            for url_index, url_pattern in enumerate(self.search_urls):
-                print(f"🔍 Trying URL pattern {url_index + 1}: {url_pattern.split('{}')[0]}...")
-                
-                url = url_pattern.format(quote_plus(query))
-                
-                try:
-                    # Navigate to search page
-                    self.driver.get(url)
-                    print(f"  ✅ Navigated to search page")
-                    
-                    # Wait for page to load and for search results
-                    time.sleep(5)
-                    
-                    # Try to wait for search results to appear
-                    try:
-                        # Wait for any product elements to be present
-                        WebDriverWait(self.driver, 10).until(
-                            lambda driver: len(driver.find_elements(By.CSS_SELECTOR, 'a[href*="/item/"]')) > 0
-                        )
-                        print(f"  ✅ Search results loaded")
-                    except TimeoutException:
-                        print(f"  ⚠️  Timeout waiting for search results, proceeding anyway...")
-                    
-                    # Scroll to load more products
-                    self._scroll_and_load()
-                    
-                    # Get page source and parse
-                    html = self.driver.page_source
+        # The browser is reused across keywords, so start each search clean
+        if self.driver:
+            self.driver.delete_all_cookies()
+        
+        for url_index, url_pattern in enumerate(self.search_urls):
+            print(f"🔍 Trying URL pattern {url_index + 1}: {url_pattern.split('{}')[0]}...")
+            
+            url = url_pattern.format(quote_plus(query))
+            
+            try:
+                html = self.cache.get(url) if self.cache else None
+                from_cache = html is not None
+                items = []
+                if from_cache:
+                    print(f"  ✅ Loaded search page from cache")
                     items = self._parse_search_results(html, query, max_results_per_keyword)
+                else:
+                    # Plain HTTP first; skip it for URLs where it was recently blocked
+                    http_blocked = self.cache and self.cache.get(_HTTP_BLOCKED_PREFIX + url) is not None
+                    html = None if http_blocked else self._try_http_search(url)
+                    if html:
+                        items = self._parse_search_results(html, query, max_results_per_keyword)
                     
-                    if items:
-                        print(f"  ✅ Found {len(items)} relevant products")
-                        all_items.extend(items)
-                        if len(all_items) >= max_results_per_keyword:
+                    if not items:
+                        # Only a login/captcha answer marks the URL, not a network error
+                        if self.cache and html is False:
+                            self.cache.set(_HTTP_BLOCKED_PREFIX + url, '')
+                        # Only start Chrome once a page actually has to be rendered
+                        if not self.driver and not self.setup_driver(headless=True):
+                            print("❌ Cannot initialize WebDriver")
                             break
-                    else:
-                        print(f"  ❌ No relevant products found")
-                        
-                except Exception as e:
-                    print(f"  ❌ Error with URL pattern {url_index + 1}: {e}")
-                    continue
+                        html = self._fetch_page(url)
+                        items = self._parse_search_results(html, query, max_results_per_keyword)
+                
+                if items:
+                    if self.cache and not from_cache:
+                        self.cache.set(url, html)
+                    print(f"  ✅ Found {len(items)} relevant products")
+                    all_items.extend(items)
+                    if len(all_items) >= max_results_per_keyword:
+                        break
+                else:
+                    print(f"  ❌ No relevant products found")
                     
-        finally:
-            if self.driver:
-                self.driver.quit()
+            except Exception as e:
+                print(f"  ❌ Error with URL pattern {url_index + 1}: {e}")
+                continue
                 
         return all_items[:max_results_per_keyword]
     
+    def _try_http_search(self, url):
+        """
+        Fetch a search page without a browser. Returns the HTML, False if
+        AliExpress answered with a login/captcha page instead of results,
+        or None if the request itself failed
+        """
+        try:
+            response = _SESSION.get(url, headers=_HTTP_HEADERS, timeout=(3.05, 15))
+        except requests.RequestException as e:
+            print(f"  ⚠️  HTTP fetch failed: {e}")
+            return None
+        
+        blocked = (
+            response.status_code != 200
+            or 'login.aliexpress.com' in response.url
+            or 'punish' in response.url
+            or '<title>Please verify' in response.text
+        )
+        if blocked or not _INLINE_DATA_RE.search(response.text):
+            print(f"  ⚠️  Plain HTTP blocked, falling back to Chrome")
+            return False
+        
+        print(f"  ✅ Fetched search page over HTTP")
+        return response.text
+    
+    def _fetch_page(self, url):
+        """Load a search page in Chrome and return the rendered HTML"""
+        # Navigate to search page
+        self.driver.get(url)
+        print(f"  ✅ Navigated to search page")
+        
+        # Wait until search results appear and stop changing
+        if self._wait_products(1):
+            print(f"  ✅ Search results loaded")
+        else:
+            print(f"  ⚠️  Timeout waiting for search results, proceeding anyway...")
+        
+        # Scroll to load more products
+        self._scroll_and_load()
+        
+        return self.driver.page_source
+    
+    def _wait_products(self, target, timeout=10):
+        """
+        Poll until at least target product links are present and the count is
+        unchanged across two consecutive polls. Returns the count, or 0 on timeout
+        """
+        last_count = [-1]
+        
+        def stable(driver):
+            count = len(driver.find_elements(By.CSS_SELECTOR, 'a[href*="/item/"]'))
+            settled = count >= target and count == last_count[0]
+            last_count[0] = count
+            return count if settled else False
+        
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.25).until(stable)
+        except TimeoutException:
+            return 0
+    
     def _scroll_and_load(self):
         """Scroll page to load more products"""
         try:
+            current_products = len(self.driver.find_elements(By.CSS_SELECTOR, 'a[href*="/item/"]'))
             # Scroll down a few times to trigger lazy loading
             for i in range(3):
+                if current_products > 10:  # If we have enough products, stop scrolling
+                    break
+                
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
                 
-                # Check if there are more products after scrolling
-                current_products = len(self.driver.find_elements(By.CSS_SELECTOR, 'a[href*="/item/"]'))
-                if current_products > 10:  # If we have enough products, stop scrolling
+                # Stop once scrolling no longer loads more products
+                loaded = self._wait_products(current_products + 1, timeout=5)
+                if not loaded:
                     break
+                current_products = loaded
                     
         except Exception as e:
             print(f"  Warning: Scroll loading failed: {e}")
 
     def _parse_search_results(self, html, search_query, max_results):
         """Parse search results with improved relevance filtering"""
-        soup = BeautifulSoup(html, 'lxml')
         items = []
+        search_terms = set(_TOKEN_RE.findall(search_query.lower()))
+        
+        # Server-rendered pages carry the results as JSON, no DOM walk needed
+        inline_items = self._parse_inline_items(html)
+        if inline_items:
+            print(f"  Found {len(inline_items)} products in inline page data")
+            items = [item for item in inline_items if self._is_relevant_product(item, search_terms)]
+            print(f"  Filtered to {len(items[:max_results])} relevant products")
+            return items[:max_results]
+        
+        try:
+            tree = lxml_html.fromstring(html)
+        except (etree.ParserError, ValueError):
+            return items
         
         # Find all product links
-        product_links = soup.find_all('a', href=lambda x: x and '/item/' in x if x else False)
+        product_links = _PRODUCT_LINKS_XPATH(tree)
         print(f"  Found {len(product_links)} product links total")
         
-        search_terms = search_query.lower().split()
-        
         for link in product_links[:max_results * 3]:  # Check more than needed to filter
             try:
+                # The link title is used as the product title when present, so
+                # irrelevant links can be skipped before walking their container
+                link_title = (link.get('title') or '').strip()
+                if len(link_title) > 10 and not self._is_relevant_title(link_title[:200], search_terms):
+                    continue
+                
                 item_data = self._extract_product_info(link, search_terms)
                 if item_data and self._is_relevant_product(item_data, search_terms):
                     items.append(item_data)
@@ -289,31 +798,54 @@ class AliExpressFixedScraper:
         print(f"  Filtered to {len(items)} relevant products")
         return items
     
+    def _parse_inline_items(self, html):
+        """Extract products from the JSON embedded in a server-rendered search page"""
+        match = _INLINE_DATA_RE.search(html)
+        if not match:
+            return []
+        try:
+            data, _ = json.JSONDecoder().raw_decode(html, match.end())
+        except ValueError:
+            return []
+        
+        items = []
+        for product in _find_item_list(data) or []:
+            if not isinstance(product, dict):
+                continue
+            title = (product.get('title') or {}).get('displayTitle')
+            if not title:
+                continue
+            price = ((product.get('prices') or {}).get('salePrice') or {}).get('formattedPrice')
+            image_url = (product.get('image') or {}).get('imgUrl')
+            if image_url and image_url.startswith('//'):
+                image_url = 'https:' + image_url
+            items.append({
+                'title': title[:200],
+                'price': price or "N/A",
+                'imagelink': image_url or "No image",
+                'prdid': str(product.get('productId') or "N/A")
+            })
+        return items
+    
     def _extract_product_info(self, link_element, search_terms):
         """Extract comprehensive product information"""
         try:
-            # Find the parent container that has all product info
-            product_container = link_element
-            
-            # Look for parent containers that might have all the info
-            for _ in range(5):  # Go up 5 levels max
-                if product_container.parent:
-                    product_container = product_container.parent
-                else:
-                    break
+            # Find the product card that has all product info
+            ancestors = _PRODUCT_CARD_XPATH(link_element) or _CONTAINER_XPATH(link_element)
+            product_container = ancestors[0] if ancestors else link_element
             
             # Extract title from various sources
             title = None
             title_sources = [
                 link_element.get('title'),
-                link_element.get_text(strip=True),
+                ''.join(text.strip() for text in link_element.itertext()),
             ]
             
             # Look for title in nearby elements
-            for elem in product_container.find_all(['h1', 'h2', 'h3', 'h4', 'span', 'div'], limit=10):
+            for elem in _TITLE_CANDIDATES_XPATH(product_container):
                 if elem.get('title'):
                     title_sources.append(elem.get('title'))
-                text = elem.get_text(strip=True)
+                text = ''.join(t.strip() for t in elem.itertext())
                 if len(text) > 20 and len(text) < 200:  # Reasonable title length
                     title_sources.append(text)
             
@@ -327,27 +859,16 @@ class AliExpressFixedScraper:
                 return None
             
             # Extract price with better methods
-            price = "N/A"
-            price_patterns = [
-                r'\$\s*[\d,]+\.?\d*',
-                r'US\s*\$\s*[\d,]+\.?\d*',
-                r'€\s*[\d,]+\.?\d*',
-                r'£\s*[\d,]+\.?\d*',
-                r'[\d,]+\.?\d*\s*\$',
-            ]
-            
             # Search in the product container text
-            container_text = product_container.get_text()
-            for pattern in price_patterns:
-                matches = re.findall(pattern, container_text, re.IGNORECASE)
-                if matches:
-                    price = matches[0].strip()
-                    break
+            container_text = ''.join(product_container.itertext())
+            price_match = _PRICE_RE.search(container_text)
+            price = price_match.group(0).strip() if price_match else "N/A"
             
             # Extract image URL
             image_url = None
-            img_elem = product_container.find('img')
-            if img_elem:
+            img_elems = _FIRST_IMG_XPATH(product_container)
+            if img_elems:
+                img_elem = img_elems[0]
                 image_url = (img_elem.get('src') or 
                            img_elem.get('data-src') or 
                            img_elem.get('data-lazy-src') or
@@ -364,7 +885,7 @@ class AliExpressFixedScraper:
             if '/item/' in href:
                 try:
                     # Extract ID from various URL formats
-                    id_match = re.search(r'/item/(\d+)', href)
+                    id_match = _ITEM_ID_RE.search(href)
                     if id_match:
                         product_id = id_match.group(1)
                 except:
@@ -385,17 +906,14 @@ class AliExpressFixedScraper:
         if not item_data or not item_data.get('title'):
             return False
         
-        title_lower = item_data['title'].lower()
-        
-        # Check if at least one search term appears in the title
-        relevance_score = 0
-        for term in search_terms:
-            if term in title_lower:
-                relevance_score += 1
-        
+        return self._is_relevant_title(item_data['title'], search_terms)
+    
+    def _is_relevant_title(self, title, search_terms):
+        """Check a title against the set of search terms"""
         # Product is relevant if it contains at least one search term
         # or if the title is substantial (not just random text)
-        return relevance_score > 0 or len(item_data['title']) > 30
+        title_tokens = _TOKEN_RE.findall(title.lower())
+        return not search_terms.isdisjoint(title_tokens) or len(title) > 30
 
 def main():
     print("=" * 60)
@@ -424,12 +942,7 @@ def main():
     check_keywords_file()
     
     # Read keywords from CSV
-    with open('Keywords.csv', 'r') as file:
-        reader = csv.DictReader(file)
-        keywords = [row['Keywords'].strip() for row in reader]
-    
-    # Filter out empty keywords
-    keywords = [k for k in keywords if k]
+    keywords = read_keywords('Keywords.csv')
     
     print(f"Keywords to search: {keywords}")
     
@@ -448,51 +961,106 @@ def main():
     print(f"Using price multiplier: {price_multiplier}")
     print()
     
-    scraper = AliExpressFixedScraper()
+    # Pass --no-cache to always fetch fresh search pages
+    cache = None if '--no-cache' in sys.argv else PageCache()
+    
+    # Keywords that only differ in case or spacing share one scrape and
+    # one description; the first spelling is used as the category
+    searches = {}
+    for keyword in keywords:
+        searches.setdefault(normalize_keyword(keyword), keyword)
+    if len(searches) < len(keywords):
+        print(f"Merged {len(keywords) - len(searches)} duplicate keywords")
+    
+    # Generate descriptions for every category up front in one batch
+    category_descriptions = {
+        keyword: {'short': short_desc, 'full': full_desc}
+        for keyword, (short_desc, full_desc) in generate_category_descriptions_batch(searches.values()).items()
+    }
+    
+    # Products are appended to output.csv as each keyword finishes, so an
+    # interrupted run keeps everything scraped so far. Titles already in the
+    # file are skipped
+    seen_titles = load_seen_titles('output.csv')
+    if seen_titles:
+        print(f"Appending to output.csv ({len(seen_titles)} products already saved)")
+    csvfile = open('output.csv', 'a', newline='', encoding='utf-8')
+    writer = csv.writer(csvfile)
+    if csvfile.tell() == 0:
+        writer.writerow(OUTPUT_FIELDS)
+        csvfile.flush()
     
-    # Dictionary to store unique products
-    unique_products = {}
-    category_descriptions = {}
+    written = 0
+    samples = []
     successful_searches = 0
     
-    for keyword in keywords:
-        # Generate descriptions for this category once
-        if keyword not in category_descriptions:
-            print(f"Generating descriptions for category: {keyword}")
-            short_desc, full_desc = generate_category_descriptions(keyword)
-            category_descriptions[keyword] = {
-                'short': short_desc,
-                'full': full_desc
-            }
-        
+    # Pool of scrapers, each owning its own Chrome session
+    pool_size = max(1, min(SCRAPER_WORKERS, len(searches)))
+    scrapers = queue.Queue()
+    for _ in range(pool_size):
+        scrapers.put(AliExpressFixedScraper(cache=cache))
+    
+    def scrape_keyword(keyword):
         print(f"\n🎯 Searching AliExpress for: '{keyword}'")
         print("-" * 50)
         
-        results = scraper.search(keyword, max_results_per_keyword)
-        
-        if results:
-            print(f"✅ Found {len(results)} relevant results for '{keyword}'")
-            successful_searches += 1
+        scraper = scrapers.get()
+        try:
+            results = scraper.search(keyword, max_results_per_keyword)
+            # Jittered delay so parallel sessions don't hit AliExpress in lockstep
+            time.sleep(random.uniform(1, 3))
+        finally:
+            scrapers.put(scraper)
+        return results
+    
+    try:
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            futures = {keyword: executor.submit(scrape_keyword, keyword) for keyword in searches.values()}
             
-            for item in results:
-                unique_key = item['title']
-                if unique_key not in unique_products:
-                    item['category'] = keyword
-                    item['short_description'] = category_descriptions[keyword]['short']
-                    item['description'] = category_descriptions[keyword]['full']
-                    unique_products[unique_key] = item
-                    
-                    if len(unique_products) >= total_results_limit:
+            # Searches run in parallel, but results are written in keyword
+            # order so the total limit is filled from the first keywords
+            for keyword, future in futures.items():
+                results = future.result()
+                if not results:
+                    print(f"❌ No relevant results found for '{keyword}'")
+                    continue
+                
+                print(f"✅ Found {len(results)} relevant results for '{keyword}'")
+                successful_searches += 1
+                new_items = []
+                for item in results:
+                    if written + len(new_items) >= total_results_limit:
                         print(f"Reached total results limit of {total_results_limit}")
                         break
-        else:
-            print(f"❌ No relevant results found for '{keyword}'")
-        
-        if len(unique_products) >= total_results_limit:
-            break
-        
-        # Delay between searches
-        time.sleep(3)
+                    if item['title'] not in seen_titles:
+                        seen_titles.add(item['title'])
+                        new_items.append(item)
+                
+                if new_items:
+                    descriptions = category_descriptions[keyword]
+                    cleaned_prices = clean_prices((item['price'] for item in new_items), price_multiplier)
+                    writer.writerows(
+                        (item['imagelink'], item['title'], cleaned_price, keyword,
+                         descriptions['short'], descriptions['full'])
+                        for item, cleaned_price in zip(new_items, cleaned_prices)
+                    )
+                    csvfile.flush()
+                    
+                    written += len(new_items)
+                    for item, cleaned_price in zip(new_items, cleaned_prices):
+                        if len(samples) < 3:
+                            samples.append((keyword, item['title'], item['price'], cleaned_price))
+                
+                if written >= total_results_limit:
+                    # Don't start searches whose results are no longer needed
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+    finally:
+        while not scrapers.empty():
+            scrapers.get().close()
+        csvfile.close()
+        if cache:
+            cache.close()
     
     # Results summary
     print("\n" + "=" * 60)
@@ -500,42 +1068,19 @@ def main():
     print("=" * 60)
     print(f"Keywords processed: {len(keywords)}")
     print(f"Successful searches: {successful_searches}")
-    print(f"Total unique products: {len(unique_products)}")
+    print(f"Total unique products: {written}")
     
-    # Write to CSV
-    if unique_products:
-        with open('output.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for product in unique_products.values():
-                cleaned_price = clean_price(product['price'], price_multiplier)
-                writer.writerow({
-                    'Image': product['imagelink'],
-                    'Title': product['title'],
-                    'Regular Price': cleaned_price,
-                    'Category': product['category'],
-                    'Short_description': product['short_description'],
-                    'description': product['description']
-                })
-        
+    if written:
         print(f"✅ Results saved to output.csv")
-        print(f"📄 Total results written: {len(unique_products)}")
+        print(f"📄 Total results written: {written}")
         
         # Show sample results
         print(f"\n📋 Sample results:")
-        for i, (title, product) in enumerate(list(unique_products.items())[:3], 1):
-            print(f"  {i}. [{product['category']}] {title[:80]}...")
-            print(f"     Price: {product['price']} → {clean_price(product['price'], price_multiplier)}")
+        for i, (category, title, price, cleaned_price) in enumerate(samples, 1):
+            print(f"  {i}. [{category}] {title[:80]}...")
+            print(f"     Price: {price} → {cleaned_price}")
             
     else:
-        # Create empty CSV
-        with open('output.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-        
         print("❌ No products were scraped successfully.")
         print("\n🔧 TROUBLESHOOTING:")
         print("1. Check internet connection")
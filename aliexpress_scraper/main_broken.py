@@ -1,17 +1,29 @@
 import requests
+import pandas as pd
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 from urllib.parse import quote_plus
 import csv
 import time
 import json
 import sys
 import os
+import asyncio
+import gzip
+import hashlib
+import tempfile
+from itertools import chain, islice
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import re
 from dotenv import load_dotenv
 
 # Selenium imports
 try:
     from selenium import webdriver
     from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service as ChromeService
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
@@ -22,6 +34,27 @@ except ImportError:
     SELENIUM_AVAILABLE = False
     print("⚠️  Selenium not available. Install with: pip install selenium webdriver-manager")
 
+# Optional async HTTP client used to prefetch search pages without a browser
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Optional faster JSON encoder/decoder for Gemini payloads
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_dumps(data):
+    """Encode to JSON bytes with orjson when installed"""
+    return orjson.dumps(data) if ORJSON_AVAILABLE else json.dumps(data).encode('utf-8')
+
+def _json_loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
 load_dotenv()
 # Gemini AI configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -35,6 +68,119 @@ if not GEMINI_ENDPOINT.endswith('/'):
     GEMINI_ENDPOINT += '/'
 GEMINI_BASE_URL = f"{GEMINI_ENDPOINT}gemini-2.0-flash-exp:generateContent"
 
+# Generated descriptions are cached on disk so re-runs skip Gemini
+DESCRIPTION_CACHE_PATH = os.getenv('DESCRIPTION_CACHE_PATH', '.desc_cache.json')
+
+# Categories described per Gemini request, and the "N)" block markers in its answer
+DESCRIPTION_BATCH_SIZE = 20
+_BATCH_INDEX_RE = re.compile(r'^\s*(\d+)\)', re.MULTILINE)
+
+# Keep-alive session reused for every Gemini request
+_GEMINI_SESSION = requests.Session()
+_GEMINI_SESSION.headers.update({
+    'Content-Type': 'application/json',
+    'x-goog-api-key': GEMINI_API_KEY
+})
+
+def _has_class(name):
+    """XPath predicate matching a whole class token, like CSS .name"""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+# XPath expressions compiled once instead of per product element
+# Product containers for the different AliExpress layouts
+ITEM_XPATHS = [
+    (label, etree.XPath(xpath)) for label, xpath in (
+        ('recommend-card', f'//div[{_has_class("recommend-card--card-wrap--2jjBf6S")}]'),  # From reference scraper
+        ('widget-common-recommend', '//div[@data-widget-cid="widget-common-recommend"]'),
+        ('gallery-layout-list-item', f'//div[{_has_class("gallery-layout-list-item")}]'),
+        ('product-item', f'//div[{_has_class("product-item")}]'),
+        ('item links', '//a[contains(@href, "/item/")]'),
+    )
+]
+# Title candidates in order of preference, tested against each node during the
+# single walk in _extract_product_data
+TITLE_CHECKS = [
+    lambda node: node.tag == 'div' and 'font-size: 14px' in node.get('style', ''),  # Reference scraper style
+    lambda node: node.tag == 'h3',
+    lambda node: node.tag == 'h4',
+    lambda node: node.tag == 'span' and node.get('title') is not None,
+    lambda node: node.tag == 'a' and node.get('title') is not None,
+]
+
+# Price sources in order of preference; a price span beats a wrapper div
+PRICE_CHECKS = [
+    lambda node: node.tag == 'span' and 'price' in node.get('class', ''),
+    lambda node: node.tag == 'div' and 'price' in node.get('class', ''),
+]
+
+def _title_from(node):
+    return node.get('title') or _element_text(node)
+
+def _element_text(element):
+    """lxml equivalent of BeautifulSoup's get_text(strip=True)"""
+    return ''.join(text.strip() for text in element.itertext())
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+_NON_WORD_RE = re.compile(r'\W+')
+
+def _normalize_title(title):
+    """Dedup key that ignores case, punctuation and spacing differences"""
+    return _NON_WORD_RE.sub('', title.lower())[:80]
+
+# Numeric tokens in a price string, with optional thousands separators
+_PRICE_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+# Resources Chrome skips while rendering search pages
+BLOCKED_RESOURCE_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.woff*", "*.css", "*/ads/*"]
+
+def _is_blocked_page(url, html):
+    """Detect AliExpress login/captcha pages served instead of results"""
+    return (
+        'login.aliexpress.com' in url
+        or 'punish' in url
+        or '<title>Please verify' in html
+        or len(html) < 5000
+    )
+
+async def _fetch_search_page(session, semaphore, url, retries=3):
+    """GET one search page, backing off on rate limits and server errors"""
+    async with semaphore:
+        for attempt in range(retries):
+            try:
+                async with session.get(url) as response:
+                    if response.status == 200:
+                        html = await response.text()
+                        return None if _is_blocked_page(str(response.url), html) else html
+                    if response.status not in (429, 500, 502, 503, 504):
+                        return None
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            await asyncio.sleep(2 ** attempt)
+    return None
+
+async def _fetch_search_pages(urls):
+    connector = aiohttp.TCPConnector(limit_per_host=8)
+    timeout = aiohttp.ClientTimeout(total=20)
+    semaphore = asyncio.Semaphore(16)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=BROWSER_HEADERS) as session:
+        pages = await asyncio.gather(*[_fetch_search_page(session, semaphore, url) for url in urls])
+    return dict(zip(urls, pages))
+
+def prefetch_search_pages(urls):
+    """
+    Fetch all search pages concurrently over plain HTTP.
+    Returns {url: html} for pages that came back with results (not blocked)
+    """
+    if not AIOHTTP_AVAILABLE or not urls:
+        return {}
+    pages = asyncio.run(_fetch_search_pages(list(urls)))
+    return {url: html for url, html in pages.items() if html}
+
 def check_keywords_file():
     """Check if Keywords.csv exists in the current directory"""
     if not os.path.exists('Keywords.csv'):
@@ -43,15 +189,12 @@ def check_keywords_file():
         sys.exit(1)
     return True
 
-def generate_category_descriptions(category):
-    """
-    Generate short description and full description for a category using Gemini AI
-    """
-    headers = {
-        'Content-Type': 'application/json',
-        'x-goog-api-key': GEMINI_API_KEY
-    }
+def _fallback_descriptions(category):
+    """Default descriptions used when Gemini is unavailable"""
+    return f"Quality {category} products", f"Discover our selection of {category} products with competitive prices and excellent quality"
 
+def _description_request(category):
+    """Gemini request body asking for a category's descriptions"""
     prompt = f"""You're a woocommerce store owner writing concise yet informative descriptions for a product category.
 
 Please write for the product category '{category}':
@@ -64,7 +207,64 @@ FULL: [your full description]
 
 Make the descriptions engaging and suitable for an e-commerce website."""
 
-    data = {
+    return {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }]
+    }
+
+def _response_text(result):
+    """Text of the first candidate in a Gemini response, or None"""
+    if 'candidates' in result and result['candidates']:
+        content = result['candidates'][0].get('content', {})
+        if 'parts' in content and content['parts']:
+            return content['parts'][0].get('text', '')
+    return None
+
+def _parse_description_lines(text):
+    """Return (short, full) from SHORT:/FULL: lines"""
+    short_desc = ""
+    full_desc = ""
+    
+    for line in text.strip().split('\n'):
+        line = line.strip()
+        if line.startswith('SHORT:'):
+            short_desc = line.replace('SHORT:', '').strip()
+        elif line.startswith('FULL:'):
+            full_desc = line.replace('FULL:', '').strip()
+    
+    return short_desc, full_desc
+
+def _parse_description_response(result):
+    """Return (short, full) from a Gemini response, or None if either is missing"""
+    text = _response_text(result)
+    if text is None:
+        return None
+    short_desc, full_desc = _parse_description_lines(text)
+    return (short_desc, full_desc) if short_desc and full_desc else None
+
+def _batch_description_request(categories):
+    """Gemini request body asking for several categories' descriptions at once"""
+    numbered = '\n'.join(f"{i}) {category}" for i, category in enumerate(categories, 1))
+    prompt = f"""You're a woocommerce store owner writing concise yet informative descriptions for product categories.
+
+For each numbered product category below write:
+1. A short description (maximum 20 words)
+2. A full description (maximum 50 words)
+
+Format your response as one block per category, starting with its number:
+1)
+SHORT: [your short description]
+FULL: [your full description]
+
+Make the descriptions engaging and suitable for an e-commerce website.
+
+Categories:
+{numbered}"""
+
+    return {
         "contents": [{
             "parts": [{
                 "text": prompt
@@ -72,68 +272,216 @@ Make the descriptions engaging and suitable for an e-commerce website."""
         }]
     }
 
+def _parse_batch_description_response(result, categories):
+    """Return {category: (short, full)} for the blocks found in a batch response"""
+    text = _response_text(result)
+    if not text:
+        return {}
+    
+    markers = list(_BATCH_INDEX_RE.finditer(text))
+    descriptions = {}
+    for marker, next_marker in zip(markers, markers[1:] + [None]):
+        index = int(marker.group(1)) - 1
+        if not 0 <= index < len(categories):
+            continue
+        block = text[marker.end():next_marker.start() if next_marker else len(text)]
+        short_desc, full_desc = _parse_description_lines(block)
+        if short_desc and full_desc:
+            descriptions[categories[index]] = (short_desc, full_desc)
+    return descriptions
+
+def _post_gemini(body):
+    """POST a request body to Gemini, returns the decoded response or None"""
     try:
-        response = requests.post(GEMINI_BASE_URL, headers=headers, json=data)
+        response = _GEMINI_SESSION.post(GEMINI_BASE_URL, data=_json_dumps(body), timeout=30)
         if response.status_code == 200:
-            result = response.json()
-            if 'candidates' in result and result['candidates']:
-                content = result['candidates'][0].get('content', {})
-                if 'parts' in content and content['parts']:
-                    text = content['parts'][0].get('text', '')
-                    
-                    # Parse the response
-                    lines = text.strip().split('\n')
-                    short_desc = ""
-                    full_desc = ""
-                    
-                    for line in lines:
-                        if line.startswith('SHORT:'):
-                            short_desc = line.replace('SHORT:', '').strip()
-                        elif line.startswith('FULL:'):
-                            full_desc = line.replace('FULL:', '').strip()
-                    
-                    return short_desc, full_desc
-        else:
-            print(f"Gemini API error: {response.status_code}")
+            return _json_loads(response.content)
+        print(f"Gemini API error: {response.status_code}")
     except Exception as e:
         print(f"Error generating descriptions: {e}")
+    return None
+
+def _request_category_descriptions(category):
+    """Ask Gemini for a category's descriptions, returns None on failure"""
+    result = _post_gemini(_description_request(category))
+    return _parse_description_response(result) if result else None
+
+def generate_category_descriptions(category):
+    """
+    Generate short description and full description for a category using Gemini AI
+    """
+    return _request_category_descriptions(category) or _fallback_descriptions(category)
+
+async def _post_gemini_async(session, semaphore, body):
+    async with semaphore:
+        try:
+            async with session.post(GEMINI_BASE_URL, data=_json_dumps(body)) as response:
+                if response.status == 200:
+                    return _json_loads(await response.read())
+                print(f"Gemini API error: {response.status}")
+        except Exception as e:
+            print(f"Error generating descriptions: {e}")
+    return None
+
+async def _post_gemini_all_async(bodies):
+    headers = {
+        'Content-Type': 'application/json',
+        'x-goog-api-key': GEMINI_API_KEY
+    }
+    timeout = aiohttp.ClientTimeout(total=60)
+    semaphore = asyncio.Semaphore(8)
+    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+        return await asyncio.gather(*[_post_gemini_async(session, semaphore, body) for body in bodies])
+
+def _post_gemini_all(bodies):
+    """POST several request bodies, concurrently when aiohttp is available"""
+    if AIOHTTP_AVAILABLE:
+        return asyncio.run(_post_gemini_all_async(bodies))
+    return [_post_gemini(body) for body in bodies]
+
+def _description_cache_key(category):
+    """Cache key covering the model endpoint, so switching models invalidates entries"""
+    return f"{GEMINI_BASE_URL}|{category}"
+
+def _load_description_cache():
+    try:
+        with open(DESCRIPTION_CACHE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_description_cache(cache):
+    try:
+        with open(DESCRIPTION_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️  Could not save description cache: {e}")
+
+def generate_all_category_descriptions(categories):
+    """
+    Return {category: (short, full)} for all categories. Cached categories are
+    read from disk, the rest are requested from Gemini in batched prompts
+    """
+    cache = _load_description_cache()
+    categories = list(dict.fromkeys(categories))
+    missing = [c for c in categories if _description_cache_key(c) not in cache]
     
-    return f"Quality {category} products", f"Discover our selection of {category} products with competitive prices and excellent quality"
+    if missing:
+        print(f"Generating descriptions for {len(missing)} categories")
+        batches = [missing[i:i + DESCRIPTION_BATCH_SIZE] for i in range(0, len(missing), DESCRIPTION_BATCH_SIZE)]
+        generated = {}
+        for batch, result in zip(batches, _post_gemini_all([_batch_description_request(b) for b in batches])):
+            if result:
+                generated.update(_parse_batch_description_response(result, batch))
+        
+        # Categories missing from a malformed batch response are asked for one by one
+        leftover = [c for c in missing if c not in generated]
+        if leftover:
+            for category, result in zip(leftover, _post_gemini_all([_description_request(c) for c in leftover])):
+                descriptions = _parse_description_response(result) if result else None
+                if descriptions:
+                    generated[category] = descriptions
+        
+        # Failed requests fall back to defaults but are not cached
+        for category, descriptions in generated.items():
+            cache[_description_cache_key(category)] = list(descriptions)
+        _save_description_cache(cache)
+    
+    return {
+        category: tuple(cache[_description_cache_key(category)])
+        if _description_cache_key(category) in cache else _fallback_descriptions(category)
+        for category in categories
+    }
 
 def clean_price(price_str, price_multiplier):
     """
     Clean the price string and multiply by the given price multiplier
     """
+    if not isinstance(price_str, str):
+        return price_str
+    
+    # Variable prices like "$15.74 - $150.00" or "US $15.74 - US $150.00" take the
+    # higher price; currency symbols and thousands separators are skipped
+    numbers = [float(match.replace(',', '')) for match in _PRICE_RE.findall(price_str)]
+    if not numbers:
+        print(f"Error processing price {price_str}: no number found")
+        return price_str.strip()  # Return original string if processing fails
+    
+    # Return formatted price without $ sign
+    return f"{max(numbers) * price_multiplier:.2f}"
+
+def clean_prices(prices, price_multiplier):
+    """
+    Vectorized clean_price over a list of price strings. Unparseable prices
+    are returned unchanged, like clean_price does
+    """
+    raw = pd.Series(prices, dtype=object)
+    matches = raw.where(raw.map(lambda p: isinstance(p, str)), '').str.extractall(f'({_PRICE_RE.pattern})')[0]
+    numbers = pd.to_numeric(matches.str.replace(',', '', regex=False))
+    values = numbers.groupby(level=0).max().reindex(raw.index) * price_multiplier
+    return [
+        f"{value:.2f}" if pd.notna(value) else (original.strip() if isinstance(original, str) else original)
+        for value, original in zip(values, raw)
+    ]
+
+# Rendered search pages are cached here when running with --use-cache
+PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR', 'cache')
+
+def _cache_path(url):
+    return os.path.join(PAGE_CACHE_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html.gz')
+
+def _cache_get(url):
+    """Return the cached page HTML for url, or None"""
     try:
-        # Remove any whitespace
-        price_str = price_str.strip()
-        
-        # Handle variable prices like "$15.74 - $150.00" or "US $15.74 - US $150.00"
-        if " - " in price_str or " to " in price_str:
-            # Split and take the higher price
-            separator = " - " if " - " in price_str else " to "
-            prices = price_str.split(separator)
-            price_str = max(prices, key=lambda x: float(x.replace("US $", "").replace("$", "").replace(",", "")))
-        
-        # Remove US $, $ sign and any commas
-        price_float = float(price_str.replace("US $", "").replace("$", "").replace(",", ""))
-        
-        # Multiply price by the provided multiplier
-        final_price = price_float * price_multiplier
-        
-        # Return formatted price without $ sign
-        return f"{final_price:.2f}"
-    except (ValueError, AttributeError) as e:
-        print(f"Error processing price {price_str}: {e}")
-        return price_str  # Return original string if processing fails
+        with gzip.open(_cache_path(url), 'rt', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _cache_put(url, html):
+    """Write page HTML to the cache atomically"""
+    os.makedirs(PAGE_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=PAGE_CACHE_DIR, suffix='.tmp')
+    try:
+        with gzip.open(os.fdopen(fd, 'wb'), 'wt', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(tmp_path, _cache_path(url))
+    except OSError as e:
+        print(f"  ⚠️  Could not cache page: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 class AliExpressSeleniumScraper:
-    def __init__(self):
+    # CHROMEDRIVER_PATH skips webdriver-manager entirely; otherwise
+    # ChromeDriverManager().install() is resolved at most once per process
+    _chromedriver_path = os.getenv('CHROMEDRIVER_PATH')
+    
+    def __init__(self, use_cache=False):
         self.driver = None
+        self.use_cache = use_cache
+        # Pages loaded from the page cache this run, so they are not rewritten
+        self.cached_urls = set()
+        # Session for the requests fallback, kept across keywords
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        })
         self.search_urls = [
             "https://www.aliexpress.com/w/wholesale-{}.html",
             "https://best.aliexpress.com/?SearchText={}",
         ]
+    
+    def open(self):
+        """Start the browser session shared by all searches"""
+        if self.driver:
+            return True
+        return self.setup_driver(headless=True)
+    
+    def close(self):
+        """Quit the shared browser session"""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
         
     def setup_driver(self, headless=True):
         """Setup Chrome WebDriver with anti-detection options"""
@@ -153,175 +501,254 @@ class AliExpressSeleniumScraper:
         options.add_experimental_option('useAutomationExtension', False)
         options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
         
+        # Image URLs are read from the HTML, so never download images
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--disable-extensions')
+        # Don't let driver.get() wait for the load event (trackers, ads);
+        # search() waits for the product nodes it needs instead
+        options.set_capability('pageLoadStrategy', 'none')
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.cookies": 1,
+        })
+        
         try:
             # Use webdriver-manager to automatically handle ChromeDriver
-            from webdriver_manager.chrome import ChromeDriverManager
-            chrome_driver_path = ChromeDriverManager().install()
-            self.driver = webdriver.Chrome(options=options)
+            if not AliExpressSeleniumScraper._chromedriver_path:
+                AliExpressSeleniumScraper._chromedriver_path = ChromeDriverManager().install()
+            service = ChromeService(AliExpressSeleniumScraper._chromedriver_path)
+            self.driver = webdriver.Chrome(service=service, options=options)
             # Execute script to hide automation
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            # Block remaining heavy subresources (stylesheets, fonts, ads)
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_URLS})
             return True
         except Exception as e:
             print(f"❌ Chrome WebDriver setup failed: {e}")
             print("💡 Error details:", str(e))
             return False
 
-    def search(self, query, max_results_per_keyword):
-        """Search for products using Selenium"""
-        if not self.setup_driver(headless=True):
+    def search_urls_for(self, query):
+        return [url_pattern.format(quote_plus(query)) for url_pattern in self.search_urls]
+    
+    def cached_pages(self, urls):
+        """Return {url: html} for the urls found in the page cache (--use-cache only)"""
+        if not self.use_cache:
+            return {}
+        pages = {}
+        for url in urls:
+            html = _cache_get(url)
+            if html:
+                pages[url] = html
+        self.cached_urls.update(pages)
+        return pages
+    
+    def search(self, query, max_results_per_keyword, prefetched=None):
+        """
+        Search for products, using cached pages and pages prefetched over HTTP
+        when available and Selenium for the rest
+        """
+        prefetched = prefetched or {}
+        all_items = []
+        served = set()
+        
+        for url in self.search_urls_for(query):
+            html = prefetched.get(url)
+            if html:
+                items = self._parse_selenium_results(html, max_results_per_keyword)
+                if items:
+                    if url in self.cached_urls:
+                        print(f"  ✅ Found {len(items)} products in cached page")
+                    else:
+                        print(f"  ✅ Found {len(items)} products over HTTP")
+                        if self.use_cache:
+                            _cache_put(url, html)
+                    served.add(url)
+                    all_items.extend(items)
+                    if len(all_items) >= max_results_per_keyword:
+                        return all_items[:max_results_per_keyword]
+        
+        if not self.driver:
+            if all_items:
+                return all_items[:max_results_per_keyword]
             print("❌ Cannot initialize WebDriver. Falling back to basic scraping...")
             return self._fallback_search(query, max_results_per_keyword)
         
-        all_items = []
+        # The browser is reused across keywords, so start each search clean
+        self.driver.delete_all_cookies()
         
-        try:
-            for url_pattern in self.search_urls:
-                print(f"🔍 Trying: {url_pattern.split('{}')[0]}...")
-                
-                url = url_pattern.format(quote_plus(query))
+        for url_pattern in self.search_urls:
+            url = url_pattern.format(quote_plus(query))
+            if url in served:
+                continue
+            
+            print(f"🔍 Trying: {url_pattern.split('{}')[0]}...")
+            
+            try:
+                self.driver.get(url)
+                print(f"  ✅ Page loaded, waiting for content...")
                 
+                # Wait until product cards or links are in the DOM
                 try:
-                    self.driver.get(url)
-                    print(f"  ✅ Page loaded, waiting for content...")
-                    
-                    # Wait for page to load
-                    time.sleep(3)
-                    
-                    # Try to scroll to load more content
-                    self._scroll_and_load()
-                    
-                    # Get page source and parse
-                    html = self.driver.page_source
-                    items = self._parse_selenium_results(html, max_results_per_keyword)
-                    
-                    if items:
-                        print(f"  ✅ Found {len(items)} products with Selenium")
-                        all_items.extend(items)
-                        if len(all_items) >= max_results_per_keyword:
-                            break
-                    else:
-                        print(f"  ❌ No products found with this URL")
-                        
-                except Exception as e:
-                    print(f"  ❌ Error with URL: {e}")
-                    continue
+                    WebDriverWait(self.driver, 10).until(EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, 'div.recommend-card--card-wrap--2jjBf6S, a[href*="/item/"]')
+                    ))
+                except TimeoutException:
+                    print(f"  ⚠️  Timeout waiting for products, parsing what loaded")
+                
+                # Try to scroll to load more content
+                self._scroll_and_load()
+                
+                # Get page source and parse
+                html = self.driver.page_source
+                items = self._parse_selenium_results(html, max_results_per_keyword)
+                
+                if items:
+                    if self.use_cache:
+                        _cache_put(url, html)
+                    print(f"  ✅ Found {len(items)} products with Selenium")
+                    all_items.extend(items)
+                    if len(all_items) >= max_results_per_keyword:
+                        break
+                else:
+                    print(f"  ❌ No products found with this URL")
                     
-        finally:
-            if self.driver:
-                self.driver.quit()
+            except Exception as e:
+                print(f"  ❌ Error with URL: {e}")
+                continue
                 
         return all_items[:max_results_per_keyword]
     
+    def _product_count(self):
+        return len(self.driver.find_elements(By.CSS_SELECTOR, 'a[href*="/item/"]'))
+    
+    def _wait_for_more_products(self, previous_count, timeout=3):
+        """Wait until the DOM is parsed and shows more products"""
+        try:
+            # With pageLoadStrategy "none" the load event can lag far behind the
+            # products, so an interactive document is enough
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: d.execute_script("return document.readyState") != 'loading'
+                and self._product_count() > previous_count
+            )
+            return True
+        except TimeoutException:
+            return False
+    
     def _scroll_and_load(self):
         """Scroll page to load dynamic content"""
         try:
             # Scroll down multiple times to load content
             for i in range(3):
+                previous_count = self._product_count()
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+                loaded_more = self._wait_for_more_products(previous_count)
                 
                 # Try to click "load more" buttons if they exist
                 try:
                     load_more_button = self.driver.find_element(By.CLASS_NAME, 'more-to-love--action--2gSTocC')
                     if load_more_button.is_displayed():
+                        previous_count = self._product_count()
                         load_more_button.click()
-                        time.sleep(2)
+                        loaded_more = self._wait_for_more_products(previous_count)
                 except:
                     pass  # Button not found, continue
+                
+                # Stop as soon as scrolling no longer brings in products
+                if not loaded_more:
+                    break
                     
         except Exception as e:
             print(f"  Warning: Scroll loading failed: {e}")
 
     def _parse_selenium_results(self, html, max_results):
         """Parse results from Selenium-rendered HTML"""
-        soup = BeautifulSoup(html, 'lxml')
+        tree = lxml_html.fromstring(html)
         items = []
         
         # Multiple selectors based on different AliExpress layouts
-        selectors = [
-            'div.recommend-card--card-wrap--2jjBf6S',  # From reference scraper
-            'div[data-widget-cid="widget-common-recommend"]',
-            'div.gallery-layout-list-item',
-            'div.product-item',
-            'a[href*="/item/"]'
-        ]
-        
-        for selector in selectors:
+        for label, select in ITEM_XPATHS:
             try:
-                elements = soup.select(selector)
-                print(f"  Selector '{selector}': found {len(elements)} elements")
+                elements = select(tree)
+                print(f"  Selector '{label}': found {len(elements)} elements")
                 
-                if elements:
-                    for element in elements[:max_results * 2]:
-                        try:
-                            item = self._extract_product_data(element)
-                            if item and item['title']:
-                                items.append(item)
-                                if len(items) >= max_results:
-                                    break
-                        except Exception as e:
-                            continue
-                    
-                    if items:
-                        break  # Found products with this selector
+                # Look at no more than twice the needed elements
+                for element in islice(elements, max_results * 2):
+                    try:
+                        item = self._extract_product_data(element)
+                        if item and item['title']:
+                            items.append(item)
+                            if len(items) >= max_results:
+                                break
+                    except Exception as e:
+                        continue
+                
+                if items:
+                    return items  # Found products with this selector
                         
             except Exception as e:
                 continue
         
-        return items[:max_results]
+        return items
     
     def _extract_product_data(self, element):
-        """Extract product data from an element"""
+        """Extract product data from an element in one walk over its subtree"""
         try:
-            title = None
-            price = "N/A"
-            image = None
-            product_id = None
+            title_nodes = [None] * len(TITLE_CHECKS)
+            price_nodes = [None] * len(PRICE_CHECKS)
+            img_node = None
+            href = None
             
-            # Extract title - multiple methods
-            title_selectors = [
-                'div[style*="font-size: 14px"]',  # Reference scraper style
-                'h3', 'h4', 'span[title]', 'a[title]'
-            ]
+            for node in chain([element], element.iterdescendants()):
+                if not isinstance(node.tag, str):
+                    continue  # comments and processing instructions
+                
+                for i, check in enumerate(TITLE_CHECKS):
+                    if title_nodes[i] is None and check(node):
+                        title_nodes[i] = node
+                
+                for i, check in enumerate(PRICE_CHECKS):
+                    if price_nodes[i] is None and check(node):
+                        price_nodes[i] = node
+                
+                if img_node is None and node.tag == 'img':
+                    img_node = node
+                elif href is None and node.tag == 'a' and '/item/' in node.get('href', ''):
+                    href = node.get('href')
+                
+                # Everything found, and the preferred title source is usable
+                if (price_nodes[0] is not None and img_node is not None and href
+                        and title_nodes[0] is not None and len(_title_from(title_nodes[0])) > 10):
+                    break
             
-            for selector in title_selectors:
-                title_elem = element.select_one(selector)
-                if title_elem:
-                    title = title_elem.get('title') or title_elem.get_text(strip=True)
+            # Extract title - preferred source first
+            title = None
+            for node in title_nodes:
+                if node is not None:
+                    title = _title_from(node)
                     if title and len(title) > 10:
                         break
             
-            # Extract price
-            price_selectors = [
-                'span.rc-modules--price--1NNLjth',  # Reference scraper
-                'span[class*="price"]',
-                'div[class*="price"]'
-            ]
-            
-            for selector in price_selectors:
-                price_elem = element.select_one(selector)
-                if price_elem:
-                    price_text = price_elem.get_text(strip=True)
+            # Extract price - first preferred source showing a dollar amount
+            price = "N/A"
+            for node in price_nodes:
+                if node is not None:
+                    price_text = _element_text(node)
                     if '$' in price_text:
                         price = price_text
                         break
             
-            # Extract image
-            img_elem = element.select_one('img')
-            if img_elem:
-                image = img_elem.get('src') or img_elem.get('data-src')
+            image = None
+            if img_node is not None:
+                image = img_node.get('src') or img_node.get('data-src')
                 if image and image.startswith('//'):
                     image = 'https:' + image
             
-            # Extract product ID from any links
-            link_elem = element.select_one('a[href*="/item/"]')
-            if link_elem:
-                href = link_elem.get('href', '')
-                if '/item/' in href:
-                    try:
-                        product_id = href.split('/item/')[-1].split('.')[0].split('?')[0]
-                    except:
-                        pass
+            # Extract product ID from the first item link
+            product_id = None
+            if href:
+                product_id = href.split('/item/')[-1].split('.')[0].split('?')[0]
             
             if title and len(title.strip()) > 5:
                 return {
@@ -340,15 +767,10 @@ class AliExpressSeleniumScraper:
         """Fallback to requests-based search if Selenium fails"""
         print("🔄 Using fallback method with requests...")
         
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
-        
         for url_pattern in self.search_urls:
             try:
                 url = url_pattern.format(quote_plus(query))
-                response = session.get(url, timeout=15)
+                response = self.session.get(url, timeout=15)
                 
                 if response.status_code == 200 and len(response.text) > 5000:
                     soup = BeautifulSoup(response.text, 'lxml')
@@ -375,6 +797,20 @@ class AliExpressSeleniumScraper:
         
         return []
 
+def _write_rows(rows, writer, csvfile, flush_every=50):
+    """Writer thread: write row tuples from the queue until None arrives"""
+    pending = 0
+    while True:
+        row = rows.get()
+        if row is None:
+            break
+        writer.writerow(row)
+        pending += 1
+        if pending >= flush_every or rows.empty():
+            csvfile.flush()
+            pending = 0
+    csvfile.flush()
+
 def main():
     print("=" * 60)
     print("AliExpress Scraper v3.0 (Selenium Edition)")
@@ -406,13 +842,17 @@ def main():
     # Check for Keywords.csv
     check_keywords_file()
     
-    # Read keywords from CSV
-    with open('Keywords.csv', 'r') as file:
-        reader = csv.DictReader(file)
-        keywords = [row['Keywords'].strip() for row in reader]
-    
-    # Filter out empty keywords
-    keywords = [k for k in keywords if k]
+    # Read keywords from CSV, skipping empty and repeated ones
+    keywords = []
+    seen_keywords = set()
+    with open('Keywords.csv', 'r', newline='') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # header
+        for row in reader:
+            keyword = row[0].strip() if row else ''
+            if keyword and keyword not in seen_keywords:
+                seen_keywords.add(keyword)
+                keywords.append(keyword)
     
     print(f"Keywords to search: {keywords}")
     
@@ -431,51 +871,98 @@ def main():
     print(f"Using price multiplier: {price_multiplier}")
     print()
     
-    scraper = AliExpressSeleniumScraper()
+    # Descriptions are generated in the background while pages are fetched
+    # and the browser starts; they are only needed once results come in
+    description_pool = ThreadPoolExecutor(max_workers=1)
+    descriptions_future = description_pool.submit(generate_all_category_descriptions, keywords)
+    description_pool.shutdown(wait=False)
+    
+    # --use-cache (or SCRAPER_USE_CACHE=1) replays rendered pages from disk
+    use_cache = '--use-cache' in sys.argv or os.getenv('SCRAPER_USE_CACHE') == '1'
+    scraper = AliExpressSeleniumScraper(use_cache=use_cache)
     
-    # Dictionary to store unique products
-    unique_products = {}
-    category_descriptions = {}
+    # Fetch every search page concurrently over HTTP first; Selenium only
+    # has to render the ones AliExpress answered with an anti-bot page.
+    # Cached pages are not requested at all
+    search_urls = [url for keyword in keywords for url in scraper.search_urls_for(keyword)]
+    prefetched = scraper.cached_pages(search_urls)
+    if use_cache:
+        print(f"📦 Loaded {len(prefetched)}/{len(search_urls)} search pages from cache")
+    fetched = prefetch_search_pages([url for url in search_urls if url not in prefetched])
+    if AIOHTTP_AVAILABLE:
+        print(f"🌐 Prefetched {len(fetched)}/{len(search_urls) - len(prefetched)} search pages over HTTP")
+    prefetched.update(fetched)
+    
+    # Products are streamed to output.csv by a writer thread as they are
+    # found, so a crash keeps everything scraped so far
+    csvfile = open('output.csv', 'w', newline='', encoding='utf-8')
+    writer = csv.writer(csvfile)
+    writer.writerow(['Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description'])
+    rows = queue.Queue()
+    writer_thread = threading.Thread(target=_write_rows, args=(rows, writer, csvfile))
+    writer_thread.start()
+    
+    written = 0
+    samples = []
     successful_searches = 0
     
-    for keyword in keywords:
-        # Generate descriptions for this category once
-        if keyword not in category_descriptions:
-            print(f"Generating descriptions for category: {keyword}")
-            short_desc, full_desc = generate_category_descriptions(keyword)
-            category_descriptions[keyword] = {
-                'short': short_desc,
-                'full': full_desc
-            }
+    try:
+        if SELENIUM_AVAILABLE and len(prefetched) < len(search_urls):
+            scraper.open()
+    
+        category_descriptions = None
         
-        print(f"\n🔍 Searching AliExpress for: {keyword}")
-        print("-" * 50)
+        # Deduplicate on a normalized title
+        seen_titles = set()
+    
+        for keyword in keywords:
+            print(f"\n🔍 Searching AliExpress for: {keyword}")
+            print("-" * 50)
         
-        results = scraper.search(keyword, max_results_per_keyword)
+            results = scraper.search(keyword, max_results_per_keyword, prefetched)
         
-        if results:
-            print(f"✅ Found {len(results)} results for '{keyword}'")
-            successful_searches += 1
-            
-            for item in results:
-                unique_key = item['title']
-                if unique_key not in unique_products:
-                    item['category'] = keyword
-                    item['short_description'] = category_descriptions[keyword]['short']
-                    item['description'] = category_descriptions[keyword]['full']
-                    unique_products[unique_key] = item
+            if results:
+                print(f"✅ Found {len(results)} results for '{keyword}'")
+                successful_searches += 1
+                
+                if category_descriptions is None:
+                    category_descriptions = {
+                        category: {'short': short_desc, 'full': full_desc}
+                        for category, (short_desc, full_desc) in descriptions_future.result().items()
+                    }
+                
+                new_items = []
+                for item in results:
+                    title_key = _normalize_title(item['title'])
+                    if title_key not in seen_titles:
+                        seen_titles.add(title_key)
+                        new_items.append(item)
                     
-                    if len(unique_products) >= total_results_limit:
-                        print(f"Reached total results limit of {total_results_limit}")
-                        break
-        else:
-            print(f"❌ No results found for '{keyword}'")
+                        if written + len(new_items) >= total_results_limit:
+                            print(f"Reached total results limit of {total_results_limit}")
+                            break
+                
+                descriptions = category_descriptions[keyword]
+                cleaned_prices = clean_prices([item['price'] for item in new_items], price_multiplier)
+                for item, cleaned_price in zip(new_items, cleaned_prices):
+                    rows.put((item['imagelink'], item['title'], cleaned_price, keyword,
+                              descriptions['short'], descriptions['full']))
+                    if len(samples) < 3:
+                        samples.append(item)
+                written += len(new_items)
+            else:
+                print(f"❌ No results found for '{keyword}'")
         
-        if len(unique_products) >= total_results_limit:
-            break
+            if written >= total_results_limit:
+                break
         
-        # Delay between searches
-        time.sleep(2)
+            # Delay between searches
+            time.sleep(2)
+    finally:
+        scraper.close()
+        rows.put(None)
+        writer_thread.join()
+        csvfile.close()
     
     # Results summary
     print("\n" + "=" * 60)
@@ -483,41 +970,18 @@ def main():
     print("=" * 60)
     print(f"Keywords processed: {len(keywords)}")
     print(f"Successful searches: {successful_searches}")
-    print(f"Total unique products: {len(unique_products)}")
+    print(f"Total unique products: {written}")
     
-    # Write to CSV
-    if unique_products:
-        with open('output.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for product in unique_products.values():
-                cleaned_price = clean_price(product['price'], price_multiplier)
-                writer.writerow({
-                    'Image': product['imagelink'],
-                    'Title': product['title'],
-                    'Regular Price': cleaned_price,
-                    'Category': product['category'],
-                    'Short_description': product['short_description'],
-                    'description': product['description']
-                })
-        
+    if written:
         print(f"✅ Results saved to output.csv")
-        print(f"📄 Total results written: {len(unique_products)}")
+        print(f"📄 Total results written: {written}")
         
         # Show sample results
         print(f"\n📋 Sample results:")
-        for i, (title, product) in enumerate(list(unique_products.items())[:3], 1):
-            print(f"  {i}. {title[:60]}... - {product['price']}")
+        for i, product in enumerate(samples, 1):
+            print(f"  {i}. {product['title'][:60]}... - {product['price']}")
             
     else:
-        # Create empty CSV
-        with open('output.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-        
         print("❌ No products were scraped successfully.")
         print("\n🔧 TROUBLESHOOTING:")
         print("1. Ensure ChromeDriver is installed and in PATH")
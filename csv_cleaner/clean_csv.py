@@ -26,6 +26,112 @@ import re
 import sys
 import os
 from datetime import datetime
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, islice
+
+from cli_args import pop_delimiter_arg
+
+# Optional: pandas cleans chunks of rows column by column
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+# Optional: ftfy repairs mis-decoded text beyond the sequences listed below
+try:
+    import ftfy
+    FTFY_AVAILABLE = True
+except ImportError:
+    FTFY_AVAILABLE = False
+
+# Patterns are compiled once; the cleaners run on every cell of every row
+_BRACKET_RE = re.compile(r'\(([A-Za-z]{5,}|[A-Za-z]+\s+[A-Za-z]+(?:\s+[A-Za-z]+)*)\)')
+_WS_RE = re.compile(r'\s+')
+_LEADING_EQ_DASH_RE = re.compile(r'^=-+\s*')
+_LEADING_DASH_EQ_RE = re.compile(r'^-=+\s*')
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7F]')
+
+# Anything in an ASCII cell that method 1 could change: the characters its
+# patterns start from, whitespace other than single inner spaces, and
+# leading or trailing space
+_NEEDLE_RE = re.compile(r'[=(&#\t\n\r\x0b\x0c\x1c-\x1f]|  |^ | $')
+
+# Method 1 replacements. Removing one = or - pattern can form another, so
+# these keep running as an ordered chain of str.replace calls
+_EQUALS_REPLACEMENTS = [
+    ('=-', ''),
+    ('-=', ''),
+    ('=--', ''),
+    ('--=', ''),
+    ('===', ''),
+    ('==', ''),
+]
+
+# Neither of these can create another match, so one alternation regex
+# gives the same result as replacing them one after another
+_SINGLE_PASS_REPLACEMENTS = {
+    '&amp;': '&',
+    '#NAME?': '',
+}
+_SINGLE_PASS_RE = re.compile('|'.join(map(re.escape, _SINGLE_PASS_REPLACEMENTS)))
+
+def _single_pass_replacement(match):
+    return _SINGLE_PASS_REPLACEMENTS[match.group()]
+
+# Damaged UTF-8 sequences as they show up in exported CSVs. Most have lost
+# their last byte, so ftfy cannot repair them and they are mapped directly.
+# Alternation order follows the list, so 'â€' wins over 'â€™'
+_MOJIBAKE_REPLACEMENTS = {
+    'â€"': '-',
+    'â€œ': '"',
+    'â€': '"',
+    'â€™': "'",
+}
+_MOJIBAKE_RE = re.compile('|'.join(map(re.escape, _MOJIBAKE_REPLACEMENTS)))
+
+def _mojibake_replacement(match):
+    return _MOJIBAKE_REPLACEMENTS[match.group()]
+
+# Method 5 sequences, matched in one left-to-right scan. Unlike the other
+# methods it leaves a bare 'â€' alone
+_FIELD_PATTERN_REPLACEMENTS = {
+    '=-': '',
+    '-=': '',
+    'â€"': '-',
+    'â€œ': '"',
+    'â€™': "'",
+    '&amp;': '&',
+    '#NAME?': '',
+}
+_FIELD_PATTERN_RE = re.compile('|'.join(map(re.escape, _FIELD_PATTERN_REPLACEMENTS)))
+
+def _field_pattern_replacement(match):
+    return _FIELD_PATTERN_REPLACEMENTS[match.group()]
+
+def _ftfy_fix_encoding(text):
+    """
+    Repair anything else that was decoded as cp1252 when ftfy is installed
+    """
+    if FTFY_AVAILABLE and not text.isascii():
+        # Only the encoding repair; fix_text would also uncurl quotes,
+        # expand ligatures and fold fullwidth characters
+        text = ftfy.fix_encoding(text)
+    return text
+
+def fix_encoding(text):
+    """
+    Repair UTF-8 text that was decoded as cp1252 (â€" → -, Ã© → é)
+    """
+    if text.isascii():
+        return text
+    text = _MOJIBAKE_RE.sub(_mojibake_replacement, text)
+    return _ftfy_fix_encoding(text)
 
 def method1_simple_string_replacement(text):
     """
@@ -35,30 +141,26 @@ def method1_simple_string_replacement(text):
     if not isinstance(text, str):
         return text
     
-    # Remove bracketed names first
-    text = re.sub(r'\(([A-Za-z]{5,}|[A-Za-z]+\s+[A-Za-z]+(?:\s+[A-Za-z]+)*)\)', '', text)
-    
-    # Simple string replacements
-    replacements = [
-        ('=-', ''),
-        ('-=', ''),
-        ('=--', ''),
-        ('--=', ''),
-        ('===', ''),
-        ('==', ''),
-        ('â€"', '-'),
-        ('â€œ', '"'),
-        ('â€', '"'),
-        ('â€™', "'"),
-        ('&amp;', '&'),
-        ('#NAME?', ''),
-    ]
+    # Each group of patterns is only scanned for when the character all of
+    # them contain is present
     
-    for find_str, replace_str in replacements:
-        text = text.replace(find_str, replace_str)
+    # Remove bracketed names first
+    if '(' in text:
+        text = _BRACKET_RE.sub('', text)
+    
+    # Simple string replacements; the = and - patterns depend on the
+    # order they run in, the rest are handled in one regex pass
+    if '=' in text:
+        for find_str, replace_str in _EQUALS_REPLACEMENTS:
+            text = text.replace(find_str, replace_str)
+            if '=' not in text:
+                break
+    text = fix_encoding(text)
+    if '&' in text or '#' in text:
+        text = _SINGLE_PASS_RE.sub(_single_pass_replacement, text)
     
     # Clean up spaces
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     return text
 
 def method2_position_based_replacement(text):
@@ -70,17 +172,15 @@ def method2_position_based_replacement(text):
         return text
     
     # Remove bracketed names first
-    text = re.sub(r'\(([A-Za-z]{5,}|[A-Za-z]+\s+[A-Za-z]+(?:\s+[A-Za-z]+)*)\)', '', text)
+    text = _BRACKET_RE.sub('', text)
     
     # Remove =- patterns at start
-    text = re.sub(r'^=-+\s*', '', text)
-    text = re.sub(r'^-=+\s*', '', text)
+    text = _LEADING_EQ_DASH_RE.sub('', text)
+    text = _LEADING_DASH_EQ_RE.sub('', text)
     
     # Clean other characters anywhere
+    text = fix_encoding(text)
     replacements = [
-        ('â€"', '-'),
-        ('â€œ', '"'),
-        ('â€', '"'),
         ('&amp;', '&'),
         ('#NAME?', ''),
     ]
@@ -88,7 +188,7 @@ def method2_position_based_replacement(text):
     for find_str, replace_str in replacements:
         text = text.replace(find_str, replace_str)
     
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     return text
 
 def method3_multiple_pass_cleaning(text):
@@ -100,7 +200,7 @@ def method3_multiple_pass_cleaning(text):
         return text
     
     # Pass 1: Remove bracketed names
-    text = re.sub(r'\(([A-Za-z]{5,}|[A-Za-z]+\s+[A-Za-z]+(?:\s+[A-Za-z]+)*)\)', '', text)
+    text = _BRACKET_RE.sub('', text)
     
     # Pass 2: Remove =- patterns
     text = text.replace('=-', '')
@@ -112,10 +212,7 @@ def method3_multiple_pass_cleaning(text):
     text = text.replace('-=', '')
     
     # Pass 5: Clean unicode characters
-    text = text.replace('â€"', '-')
-    text = text.replace('â€œ', '"')
-    text = text.replace('â€', '"')
-    text = text.replace('â€™', "'")
+    text = fix_encoding(text)
     
     # Pass 6: Clean HTML entities
     text = text.replace('&amp;', '&')
@@ -124,7 +221,7 @@ def method3_multiple_pass_cleaning(text):
     text = text.replace('#NAME?', '')
     
     # Pass 8: Clean up extra spaces
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     
     return text
 
@@ -137,7 +234,7 @@ def method4_pattern_sequential_replacement(text):
         return text
     
     # Remove bracketed names first
-    text = re.sub(r'\(([A-Za-z]{5,}|[A-Za-z]+\s+[A-Za-z]+(?:\s+[A-Za-z]+)*)\)', '', text)
+    text = _BRACKET_RE.sub('', text)
     
     # Define patterns to find and replace
     patterns = [
@@ -166,7 +263,8 @@ def method4_pattern_sequential_replacement(text):
                 changed = True
                 break
     
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _ftfy_fix_encoding(text)
+    text = _WS_RE.sub(' ', text).strip()
     return text
 
 def method5_field_by_field_processing(text):
@@ -180,54 +278,41 @@ def method5_field_by_field_processing(text):
     original = text
     
     # Step 1: Remove bracketed names
-    text = re.sub(r'\(([A-Za-z]{5,}|[A-Za-z]+\s+[A-Za-z]+(?:\s+[A-Za-z]+)*)\)', '', text)
-    
-    # Step 2: Character-by-character cleaning for problematic sequences
-    cleaned = ""
-    i = 0
-    while i < len(text):
-        # Check for multi-character patterns
-        if i <= len(text) - 2:
-            two_char = text[i:i+2]
-            if two_char in ['=-', '-=', 'â€']:
-                if two_char == '=-' or two_char == '-=':
-                    # Skip these patterns
-                    i += 2
-                    continue
-                elif two_char == 'â€':
-                    # Handle unicode sequences
-                    if i <= len(text) - 3 and text[i:i+3] in ['â€"', 'â€œ', 'â€™']:
-                        if text[i:i+3] == 'â€"':
-                            cleaned += '-'
-                        elif text[i:i+3] in ['â€œ', 'â€']:
-                            cleaned += '"'
-                        elif text[i:i+3] == 'â€™':
-                            cleaned += "'"
-                        i += 3
-                        continue
-        
-        # Check for longer patterns
-        if text[i:].startswith('&amp;'):
-            cleaned += '&'
-            i += 5
-            continue
-        elif text[i:].startswith('#NAME?'):
-            i += 6  # Skip this pattern
-            continue
-        
-        # Add regular character
-        cleaned += text[i]
-        i += 1
+    text = _BRACKET_RE.sub('', text)
+    
+    # Step 2: Scan left to right for problematic sequences; the regex
+    # engine tries them at each position like a character-by-character loop
+    cleaned = _FIELD_PATTERN_RE.sub(_field_pattern_replacement, text)
+    
+    # Step 3: Repair remaining encoding issues
+    cleaned = _ftfy_fix_encoding(cleaned)
     
     # Final cleanup
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+    cleaned = _WS_RE.sub(' ', cleaned).strip()
     return cleaned
 
+class _StripNonAsciiTable(dict):
+    """
+    str.translate table: ASCII and the preserved symbols map to themselves,
+    any other character becomes a space
+    """
+    def __missing__(self, codepoint):
+        return codepoint if codepoint < 0x80 else ' '
+
+_STRIP_NON_ASCII_TABLE = _StripNonAsciiTable({ord(char): char for char in '°™®©€£¥§'})
+
+# Product exports repeat the same cells over many rows, and cleaning only
+# depends on the text, so results are cached
+_clean_text_cached = lru_cache(maxsize=200_000)(method1_simple_string_replacement)
+
 def clean_text(text):
     """
     Main cleaning function - uses Method 1 (Simple String Replacement) by default
     """
-    return method1_simple_string_replacement(text)
+    # Most cells are plain ASCII that no step would change
+    if not isinstance(text, str) or (text.isascii() and not _NEEDLE_RE.search(text)):
+        return text
+    return _clean_text_cached(text)
     
     # Step 2: Excel-style exact replacements for problematic characters
     exact_replacements = [
@@ -291,22 +376,10 @@ def clean_text(text):
     
     # Step 3: Remove any remaining non-ASCII characters that might cause issues
     # But preserve common symbols like °, ™, ®, ©
-    preserved_chars = '°™®©€£¥§'
-    temp_replacements = {}
-    for i, char in enumerate(preserved_chars):
-        placeholder = f"__PRESERVE_{i}__"
-        temp_replacements[placeholder] = char
-        text = text.replace(char, placeholder)
-    
-    # Remove remaining problematic unicode
-    text = re.sub(r'[^\x00-\x7F]', ' ', text)
-    
-    # Restore preserved characters
-    for placeholder, char in temp_replacements.items():
-        text = text.replace(placeholder, char)
+    text = text.translate(_STRIP_NON_ASCII_TABLE)
     
     # Step 4: Clean up spacing and formatting
-    text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single space
+    text = _WS_RE.sub(' ', text)  # Multiple spaces to single space
     text = text.strip()  # Remove leading/trailing whitespace
     
     return text
@@ -387,9 +460,197 @@ def test_comprehensive_cleaner():
     
     return all_passed
 
-def clean_csv_file(input_file, output_file=None):
+def clean_series(column):
+    """
+    Clean a whole pandas column of strings, running clean_text once per
+    distinct value; product exports repeat the same cells a lot
+    """
+    codes, uniques = pd.factorize(column)
+    cleaned = pd.Series(uniques, dtype=object).map(clean_text).to_numpy()
+    return pd.Series(cleaned[codes], index=column.index, dtype=object)
+
+def clean_frame(chunk):
+    """
+    Clean a pandas chunk of rows one column at a time
+    Returns (cleaned chunk, cells modified, character changes)
+    """
+    cells_changed = 0
+    total_changes = 0
+    for col in chunk.columns:
+        original = chunk[col]
+        cleaned = clean_series(original)
+        changed = original != cleaned
+        cells_changed += int(changed.sum())
+        total_changes += int((original[changed].str.len() - cleaned[changed].str.len()).abs().sum())
+        chunk[col] = cleaned
+    return chunk, cells_changed, total_changes
+
+def clean_rows(rows):
+    """
+    Clean a list of CSV rows cell by cell
+    Returns (cleaned rows, cells modified, character changes)
+    """
+    cleaned_rows = []
+    cells_changed = 0
+    total_changes = 0
+    
+    for row in rows:
+        cleaned_row = []
+        
+        for cell in row:
+            original_cell = cell
+            cleaned_cell = clean_text(cell)
+            cleaned_row.append(cleaned_cell)
+            
+            # Count changes
+            if original_cell != cleaned_cell:
+                cells_changed += 1
+                # Count number of character changes
+                total_changes += abs(len(original_cell) - len(cleaned_cell))
+        
+        cleaned_rows.append(cleaned_row)
+    
+    return cleaned_rows, cells_changed, total_changes
+
+def clean_rows_by_column(rows):
+    """
+    Clean a list of CSV rows one column at a time with pandas. Chunks with
+    blank lines or rows of differing length are cleaned cell by cell
+    Returns (cleaned rows, cells modified, character changes)
+    """
+    width = len(rows[0])
+    if not width or any(len(row) != width for row in rows):
+        return clean_rows(rows)
+    chunk, cells_changed, total_changes = clean_frame(pd.DataFrame(rows, dtype=object))
+    return chunk.to_numpy().tolist(), cells_changed, total_changes
+
+def _map_chunks(func, chunks, workers):
+    """
+    Yield func(chunk) for every chunk in input order, spread over worker
+    processes when there is more than one chunk and more than one worker.
+    Only a few chunks per worker are in flight so memory stays bounded.
+    """
+    chunks = iter(chunks)
+    head = list(islice(chunks, 2))
+    if workers <= 1 or len(head) < 2:
+        yield from map(func, chain(head, chunks))
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chain(head, chunks):
+            pending.append(executor.submit(func, chunk))
+            if len(pending) > workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# Output is written through a 1 MiB buffer, so a chunk of rows goes to
+# disk in a handful of large writes instead of one per 8 KiB
+_WRITE_BUFFER_SIZE = 1 << 20
+
+def _read_ahead(chunks, maxsize=8):
+    """
+    Yield chunks that a reader thread pulls from the file ahead of the
+    cleaning, up to maxsize at a time. Read errors are raised here.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    
+    def read():
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    break
+                items.put((chunk, None))
+            items.put((None, None))
+        except Exception as e:
+            items.put((None, e))
+    
+    thread = threading.Thread(target=read, daemon=True)
+    thread.start()
+    finished = False
+    try:
+        while True:
+            chunk, error = items.get()
+            if chunk is None:
+                finished = True
+                if error is not None:
+                    raise error
+                return
+            yield chunk
+    finally:
+        if not finished:
+            # Stopped early; let the reader run out so it can exit
+            stop.set()
+            while items.get()[0] is not None:
+                pass
+        thread.join()
+
+@contextmanager
+def _write_behind(write, maxsize=8):
+    """
+    Provide a function that queues chunks for write() on a writer thread,
+    so writing overlaps with cleaning. Write errors are raised on exit.
+    """
+    pending = queue.Queue(maxsize=maxsize)
+    errors = []
+    
+    def writer():
+        while True:
+            chunk = pending.get()
+            if chunk is None:
+                break
+            if not errors:
+                try:
+                    write(chunk)
+                except Exception as e:
+                    errors.append(e)
+    
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        yield pending.put
+    finally:
+        pending.put(None)
+        thread.join()
+    if errors:
+        raise errors[0]
+
+def _clean_csv_rows(input_file, output_file, delimiter, workers, clean=clean_rows, chunksize=50_000):
+    """
+    Clean the file in chunks of rows read and written with the csv module,
+    so BOMs, line endings and quoting come out the same whichever clean()
+    the chunks go through
+    Returns (rows processed, cells modified, character changes)
+    """
+    rows_processed = 0
+    cells_changed = 0
+    total_changes = 0
+    
+    with open(input_file, 'r', encoding='utf-8', newline='') as infile:
+        reader = csv.reader(infile, delimiter=delimiter)
+        chunks = iter(lambda: list(islice(reader, chunksize)), [])
+        
+        with open(output_file, 'w', encoding='utf-8', newline='', buffering=_WRITE_BUFFER_SIZE) as outfile:
+            writer = csv.writer(outfile, delimiter=delimiter)
+            
+            with _write_behind(writer.writerows) as write:
+                for rows, changed, changes in _map_chunks(clean, _read_ahead(chunks), workers):
+                    write(rows)
+                    rows_processed += len(rows)
+                    cells_changed += changed
+                    total_changes += changes
+                    print(f"⚙️  Processed {rows_processed:,} rows, {cells_changed:,} cells modified...")
+    
+    return rows_processed, cells_changed, total_changes
+
+def clean_csv_file(input_file, output_file=None, workers=None, delimiter=None):
     """
     Clean a CSV file comprehensively
+    Chunks of rows are cleaned in parallel on all CPU cores unless
+    workers says otherwise. The delimiter is sniffed from the start of
+    the file when not given.
     
     Note: Output files contain proper Unicode characters (en-dashes, quotes, etc.)
     that may appear as garbled text on Windows systems due to encoding display issues.
@@ -404,52 +665,40 @@ def clean_csv_file(input_file, output_file=None):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = f"{base}_cleaned_{timestamp}{ext}"
     
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
     print(f"🧹 Starting comprehensive CSV cleaning...")
     print(f"📂 Input file: {input_file}")
     print(f"📂 Output file: {output_file}")
     print()
     
     try:
-        with open(input_file, 'r', encoding='utf-8', newline='') as infile:
-            # Detect CSV format
-            sample = infile.read(1024)
-            infile.seek(0)
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
-            
-            reader = csv.reader(infile, delimiter=delimiter)
-            
-            with open(output_file, 'w', encoding='utf-8', newline='') as outfile:
-                writer = csv.writer(outfile, delimiter=delimiter)
-                
-                rows_processed = 0
-                cells_changed = 0
-                total_changes = 0
-                
-                for row in reader:
-                    cleaned_row = []
-                    
-                    for cell in row:
-                        original_cell = cell
-                        cleaned_cell = clean_text(cell)
-                        cleaned_row.append(cleaned_cell)
-                        
-                        # Count changes
-                        if original_cell != cleaned_cell:
-                            cells_changed += 1
-                            # Count number of character changes
-                            total_changes += abs(len(original_cell) - len(cleaned_cell))
-                    
-                    writer.writerow(cleaned_row)
-                    rows_processed += 1
-                    
-                    if rows_processed % 1000 == 0:
-                        print(f"⚙️  Processed {rows_processed:,} rows, {cells_changed:,} cells modified...")
+        if delimiter is None:
+            with open(input_file, 'rb') as infile:
+                # Detect CSV format from the first block, without setting up
+                # a text decoder for it
+                sample = infile.read(1024).decode('utf-8', 'ignore')
+                sniffer = csv.Sniffer()
+                delimiter = sniffer.sniff(sample).delimiter
+        
+        # With pandas each chunk is cleaned one column at a time
+        if PANDAS_AVAILABLE:
+            counts = _clean_csv_rows(input_file, output_file, delimiter, workers,
+                                     clean=clean_rows_by_column, chunksize=100_000)
+        else:
+            counts = _clean_csv_rows(input_file, output_file, delimiter, workers)
+        rows_processed, cells_changed, total_changes = counts
         
         print()
         print(f"✅ Successfully cleaned {rows_processed:,} rows")
         print(f"📊 Modified {cells_changed:,} cells")
         print(f"🔧 Total character changes: {total_changes:,}")
+        # Worker processes keep their own caches, so this only shows when
+        # the file was cleaned in this process
+        cache = _clean_text_cached.cache_info()
+        if cache.hits or cache.misses:
+            print(f"♻️  Cache hits: {cache.hits:,} of {cache.hits + cache.misses:,} cells cleaned")
         print(f"💾 Output saved to: {output_file}")
         return True
         
@@ -471,21 +720,26 @@ def main():
         test_all_methods()
         return
     
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    delimiter = pop_delimiter_arg(args)
+    
+    if len(args) < 1:
         print("Usage:")
         print("  python comprehensive_cleaner.py --test                    # Run tests")
         print("  python comprehensive_cleaner.py <input_file> [output]     # Clean CSV file")
+        print("  Add --delimiter <char> to skip delimiter detection")
         print()
         print("Examples:")
         print("  python comprehensive_cleaner.py --test")
         print("  python comprehensive_cleaner.py products.csv")
         print("  python comprehensive_cleaner.py products.csv clean_products.csv")
+        print("  python comprehensive_cleaner.py products.csv --delimiter ';'")
         return
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    input_file = args[0]
+    output_file = args[1] if len(args) > 1 else None
     
-    success = clean_csv_file(input_file, output_file)
+    success = clean_csv_file(input_file, output_file, delimiter=delimiter)
     
     if success:
         print("\n🎉 Comprehensive CSV cleaning completed successfully!")
@@ -10,6 +10,7 @@ Date: September 2025
 """
 
 import csv
+import io
 import re
 import sys
 import os
@@ -17,6 +18,24 @@ from datetime import datetime
 import urllib.parse
 from typing import Dict, List, Tuple, Optional
 
+from cli_args import pop_delimiter_arg
+
+class _SlugTable(dict):
+    """
+    str.translate table for slugs: letters and digits map to lower case,
+    other ASCII to a hyphen, anything outside ASCII is deleted
+    """
+    def __missing__(self, codepoint):
+        return None if codepoint >= 0x80 else '-'
+
+_SLUG_TABLE = _SlugTable({ord(char): char.lower() for char in
+                          'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'})
+
+# Slug patterns, compiled once instead of on every row
+_DASH_RUN_RE = re.compile(r'-+')
+_PCT_HEX_RE = re.compile(r'%[0-9a-fA-F]{2}')
+_SAFE_SLUG_RE = re.compile(r'[a-zA-Z0-9]+(?:-[a-zA-Z0-9]+)*')
+
 def decode_and_clean_slug(encoded_slug: str) -> str:
     """
     Decode URL-encoded slug and clean special characters.
@@ -27,6 +46,10 @@ def decode_and_clean_slug(encoded_slug: str) -> str:
     - %d8%a8%d8%af%d9%8a%d8%b9-arabic-text → arabic-text
     """
     
+    # Already a clean slug, nothing to decode or strip
+    if '%' not in encoded_slug and encoded_slug.isascii() and _SAFE_SLUG_RE.fullmatch(encoded_slug):
+        return encoded_slug.lower()
+    
     # First, decode the URL encoding
     try:
         decoded = urllib.parse.unquote(encoded_slug)
@@ -34,42 +57,13 @@ def decode_and_clean_slug(encoded_slug: str) -> str:
         # If decoding fails, use original
         decoded = encoded_slug
     
-    # Remove Unicode categories:
-    # - Emoji & Symbols (including 🏅, ❤️, ✔, ❀, etc.)
-    # - CJK characters (Chinese, Japanese, Korean)
-    # - Arabic script
-    # - Other non-ASCII special characters
-    
-    # Step 1: Remove emoji and special Unicode symbols
-    # This regex removes most emoji and special symbols
-    decoded = re.sub(r'[\U0001F000-\U0001F9FF]', '', decoded)  # Emoji
-    decoded = re.sub(r'[\U00002600-\U000027BF]', '', decoded)  # Misc symbols
-    decoded = re.sub(r'[\U0001F300-\U0001F5FF]', '', decoded)  # Misc symbols & pictographs
-    decoded = re.sub(r'[\U0001F900-\U0001F9FF]', '', decoded)  # Supplemental symbols
-    decoded = re.sub(r'[\U0001F600-\U0001F64F]', '', decoded)  # Emoticons
-    decoded = re.sub(r'[\U0001F680-\U0001F6FF]', '', decoded)  # Transport & map symbols
-    
-    # Step 2: Remove CJK characters (Chinese, Japanese, Korean)
-    decoded = re.sub(r'[\u3000-\u303F]', '', decoded)  # CJK punctuation
-    decoded = re.sub(r'[\u3040-\u309F]', '', decoded)  # Hiragana
-    decoded = re.sub(r'[\u30A0-\u30FF]', '', decoded)  # Katakana
-    decoded = re.sub(r'[\u4E00-\u9FFF]', '', decoded)  # CJK unified ideographs
-    decoded = re.sub(r'[\uFF00-\uFFEF]', '', decoded)  # Full-width characters
-    decoded = re.sub(r'【|】', '', decoded)  # Special CJK brackets
-    
-    # Step 3: Remove Arabic script
-    decoded = re.sub(r'[\u0600-\u06FF]', '', decoded)  # Arabic
-    decoded = re.sub(r'[\u0750-\u077F]', '', decoded)  # Arabic supplement
-    
-    # Step 4: Remove other special Unicode characters
-    decoded = re.sub(r'[^\x00-\x7F]', '', decoded)  # Remove all non-ASCII
-    
-    # Step 5: Clean up what remains
-    # Replace any sequence of non-alphanumeric (except hyphen) with hyphen
-    cleaned = re.sub(r'[^a-zA-Z0-9\-]+', '-', decoded)
+    # One translate pass drops everything outside ASCII (emoji and symbols,
+    # CJK characters and brackets, Arabic script, ...), turns any other
+    # non-alphanumeric character into a hyphen and lower-cases the rest
+    cleaned = decoded.translate(_SLUG_TABLE)
     
     # Remove multiple consecutive hyphens
-    cleaned = re.sub(r'-+', '-', cleaned)
+    cleaned = _DASH_RUN_RE.sub('-', cleaned)
     
     # Remove leading/trailing hyphens
     cleaned = cleaned.strip('-')
@@ -79,17 +73,19 @@ def decode_and_clean_slug(encoded_slug: str) -> str:
         # We'll handle this in the main function with product ID
         return ""
     
-    return cleaned.lower()
+    return cleaned
 
 def has_url_encoding(slug: str) -> bool:
     """
     Check if a slug contains URL encoding patterns (%xx).
     """
-    return bool(re.search(r'%[0-9a-fA-F]{2}', slug))
+    return '%' in slug and _PCT_HEX_RE.search(slug) is not None
 
-def process_csv(input_file: str, output_file: Optional[str] = None) -> Dict:
+def process_csv(input_file: str, output_file: Optional[str] = None,
+                delimiter: Optional[str] = None) -> Dict:
     """
     Process CSV file and clean only products with URL-encoded slugs.
+    The delimiter is sniffed from the start of the file when not given.
     
     Returns statistics about the cleaning process.
     """
@@ -120,12 +116,13 @@ def process_csv(input_file: str, output_file: Optional[str] = None) -> Dict:
     }
     
     # Read and process CSV
-    with open(input_file, 'r', encoding='utf-8', newline='') as infile:
-        # Detect delimiter
-        sample = infile.read(1024)
-        infile.seek(0)
-        sniffer = csv.Sniffer()
-        delimiter = sniffer.sniff(sample).delimiter
+    with io.TextIOWrapper(open(input_file, 'rb'), encoding='utf-8', newline='') as infile:
+        # Detect delimiter from the bytes already buffered for the reader,
+        # so there is no seek back and re-read
+        if delimiter is None:
+            sample = infile.buffer.peek(1024)[:1024].decode('utf-8', 'ignore')
+            sniffer = csv.Sniffer()
+            delimiter = sniffer.sniff(sample).delimiter
         
         reader = csv.DictReader(infile, delimiter=delimiter)
         
@@ -230,13 +227,17 @@ def main():
     print()
     
     # Check command line arguments
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    delimiter = pop_delimiter_arg(args)
+    
+    if len(args) < 1:
         print("Usage:")
-        print("  python clean_encoded_slugs.py <input_csv> [output_csv]")
+        print("  python clean_encoded_slugs.py <input_csv> [output_csv] [--delimiter <char>]")
         print()
         print("Examples:")
         print("  python clean_encoded_slugs.py products.csv")
         print("  python clean_encoded_slugs.py products.csv products_clean.csv")
+        print("  python clean_encoded_slugs.py products.csv --delimiter ';'")
         print()
         print("Description:")
         print("  - Identifies products with %xx URL encoding in slugs")
@@ -245,11 +246,11 @@ def main():
         print("  - Creates a backup with timestamp if output not specified")
         return
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    input_file = args[0]
+    output_file = args[1] if len(args) > 1 else None
     
     # Process the CSV
-    stats = process_csv(input_file, output_file)
+    stats = process_csv(input_file, output_file, delimiter)
     
     if stats:
         # Print statistics
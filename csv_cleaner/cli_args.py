@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Command-line helpers shared by the CSV cleaning scripts
+"""
+
+import sys
+
+def pop_delimiter_arg(args):
+    """
+    Remove --delimiter <char> from the argument list and return the
+    delimiter, or None when it was not given. '\\t' means a tab.
+    """
+    if '--delimiter' not in args:
+        return None
+    i = args.index('--delimiter')
+    if i + 1 >= len(args):
+        print("❌ Error: --delimiter needs a value, e.g. --delimiter ';'")
+        sys.exit(1)
+    delimiter = args[i + 1]
+    del args[i:i + 2]
+    return '\t' if delimiter == '\\t' else delimiter
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the Comprehensive CSV Cleaner
+Cleans sample files row by row and column by column and checks that both
+produce the same bytes
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from clean_csv import PANDAS_AVAILABLE, _clean_csv_rows, clean_rows, clean_rows_by_column
+
+
+# Sample files as raw bytes, so BOMs and line endings are exactly as written
+SAMPLES = {
+    "bom": "\ufeffid,name\r\n1,=- Widget (Shahebazuddin)\r\n2,Price &amp; Quality\r\n".encode('utf-8'),
+    "bom_quoted": "\ufeff\"id\",\"name\"\r\n1,Widget\r\n".encode('utf-8'),
+    "crlf": b"a,b,c\r\n1,2,3\r\nx,  spaced   out ,z\r\n",
+    "lf": b"a,b,c\n1,2,3\n4,5,6\n",
+    "embedded_newline": b'id,description\n1,"first line\nsecond line"\n2,"quote ""here"", =- done"\n',
+    "ragged": b"a,b,c\n1,2,3\n\nx,y\n4,5,6\n",
+    "mojibake": "name\nBest â€\" choice\nâ€œQuotedâ€\n".encode('utf-8'),
+    "single_column": b'name\n\n""\nvalue\n',
+}
+
+
+def clean_bytes(data, clean):
+    """Clean raw CSV bytes with the given chunk cleaner and return the output bytes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = Path(tmp) / "input.csv"
+        output_file = Path(tmp) / "output.csv"
+        input_file.write_bytes(data)
+        # Small chunks so some files are split across several of them
+        _clean_csv_rows(str(input_file), str(output_file), ',', 1, clean=clean, chunksize=2)
+        return output_file.read_bytes()
+
+
+def test_column_path_matches_row_path():
+    """Every sample comes out byte for byte the same through both cleaners."""
+    if not PANDAS_AVAILABLE:
+        print("⚠️  pandas not installed, skipping column path test")
+        return
+    for name, data in SAMPLES.items():
+        by_row = clean_bytes(data, clean_rows)
+        by_column = clean_bytes(data, clean_rows_by_column)
+        assert by_row == by_column, f"{name}: {by_row!r} != {by_column!r}"
+
+
+def test_bom_is_kept():
+    """A leading UTF-8 BOM survives cleaning."""
+    output = clean_bytes(SAMPLES["bom"], clean_rows_by_column if PANDAS_AVAILABLE else clean_rows)
+    assert output.startswith(b"\xef\xbb\xbfid,name\r\n"), output[:20]
+
+
+def test_blank_lines_and_short_rows_are_kept():
+    """Blank lines and short rows are neither dropped nor padded."""
+    output = clean_bytes(SAMPLES["ragged"], clean_rows_by_column if PANDAS_AVAILABLE else clean_rows)
+    assert output == b"a,b,c\r\n1,2,3\r\n\r\nx,y\r\n4,5,6\r\n", output
+
+
+def main():
+    """Run the tests."""
+    print("="*60)
+    print("COMPREHENSIVE CSV CLEANER TEST")
+    print("="*60)
+
+    failed = False
+    for test in [test_column_path_matches_row_path, test_bom_is_kept, test_blank_lines_and_short_rows_are_kept]:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"❌ {test.__name__}: {e}")
+
+    if failed:
+        print("\n❌ TEST FAILED!")
+        sys.exit(1)
+    print("\n🎉 TEST COMPLETED SUCCESSFULLY!")
+
+
+if __name__ == "__main__":
+    main()
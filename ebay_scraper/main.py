@@ -1,13 +1,58 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html as lxml_html
 from urllib.parse import quote_plus
 import csv
-import time
 import json
 import sys
 import os
+import asyncio
+import re
+import threading
+import time
+from hashlib import blake2b
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+# Optional: aiohttp runs all keyword searches and Gemini calls concurrently
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Optional: uvloop's libuv event loop runs the async searches with less overhead
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+def _run_async(coro):
+    """asyncio.run, on uvloop's event loop when it is installed"""
+    if UVLOOP_AVAILABLE:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+# Optional faster JSON for Gemini requests/responses and the description cache
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_loads(data):
+    """Parse JSON bytes/str with orjson when installed, stdlib json otherwise"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _json_dumps(obj, indent=False):
+    """Serialize to UTF-8 JSON bytes with orjson when installed, stdlib json otherwise"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
 load_dotenv()
 # Gemini AI configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -21,6 +66,49 @@ if not GEMINI_ENDPOINT.endswith('/'):
     GEMINI_ENDPOINT += '/'
 GEMINI_BASE_URL = f"{GEMINI_ENDPOINT}gemini-2.0-flash-exp:generateContent"
 
+# Generated descriptions are cached on disk so re-runs skip Gemini
+DESCRIPTION_CACHE_PATH = os.getenv('DESCRIPTION_CACHE_PATH', '.desc_cache.json')
+# Categories whose Gemini request failed use the fallback text, without
+# asking again, for this many seconds
+DESCRIPTION_RETRY_AFTER = float(os.getenv('DESCRIPTION_RETRY_AFTER', '3600'))
+GEMINI_TIMEOUT = 15
+# Statuses meaning Gemini is rate limiting or down: the rest of the run
+# uses fallbacks instead of sending more requests
+GEMINI_UNAVAILABLE_STATUSES = (429, 500, 503)
+
+# Uncached categories described per Gemini request, and the "N)" block
+# markers in its answer
+DESCRIPTION_BATCH_SIZE = 20
+_BATCH_INDEX_RE = re.compile(r'^\s*(\d+)\)', re.MULTILINE)
+
+# eBay requests allowed per second across all concurrent searches
+EBAY_REQUESTS_PER_SECOND = float(os.getenv('EBAY_REQUESTS_PER_SECOND', '4'))
+
+# Longest Retry-After the aiohttp search retries will honour, in seconds
+MAX_RETRY_AFTER = 60
+
+# With an OAuth application token set, searches use eBay's Browse API (JSON)
+# and only fall back to scraping the HTML results page when it fails
+EBAY_BROWSE_TOKEN = os.getenv('EBAY_BROWSE_TOKEN')
+EBAY_BROWSE_URL = os.getenv('EBAY_BROWSE_URL', 'https://api.ebay.com/buy/browse/v1/item_summary/search')
+EBAY_MARKETPLACE_ID = os.getenv('EBAY_MARKETPLACE_ID', 'EBAY_GB')
+CURRENCY_SYMBOLS = {'GBP': '£', 'USD': '$'}
+
+class _CappedRetry(Retry):
+    """urllib3 Retry that waits at most MAX_RETRY_AFTER seconds for a Retry-After header"""
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, MAX_RETRY_AFTER)
+
+# One session for all Gemini calls so the TLS connection is reused; rate
+# limits and 503s are retried with backoff (POST included). Once retries run
+# out the last response is returned rather than raised, so its status can
+# mark Gemini unavailable
+_gemini_session = requests.Session()
+_gemini_session.mount('https://', HTTPAdapter(max_retries=_CappedRetry(
+    total=3, backoff_factor=2, status_forcelist=[429, 503], allowed_methods=None,
+    raise_on_status=False)))
+
 def check_keywords_file():
     """Check if Keywords.csv exists in the current directory"""
     if not os.path.exists('Keywords.csv'):
@@ -29,15 +117,14 @@ def check_keywords_file():
         sys.exit(1)
     return True
 
-def generate_category_descriptions(category):
-    """
-    Generate short description and full description for a category using Gemini AI
-    """
-    headers = {
+def _gemini_headers():
+    return {
         'Content-Type': 'application/json',
         'x-goog-api-key': GEMINI_API_KEY
     }
 
+def _description_request(category):
+    """Build the Gemini request body asking for descriptions of a category"""
     prompt = f"""You're a woocommerce store owner writing concise yet informative descriptions for a product category.
 
 Please write for the product category '{category}':
@@ -50,7 +137,34 @@ FULL: [your full description]
 
 Make the descriptions engaging and suitable for an e-commerce website."""
 
-    data = {
+    return {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }]
+    }
+
+def _batch_description_request(categories):
+    """Gemini request body asking for several categories' descriptions at once"""
+    numbered = '\n'.join(f"{i}) {category}" for i, category in enumerate(categories, 1))
+    prompt = f"""You're a woocommerce store owner writing concise yet informative descriptions for product categories.
+
+For each numbered product category below write:
+1. A short description (maximum 20 words)
+2. A full description (maximum 50 words)
+
+Format your response as one block per category, starting with its number:
+1)
+SHORT: [your short description]
+FULL: [your full description]
+
+Make the descriptions engaging and suitable for an e-commerce website.
+
+Categories:
+{numbered}"""
+
+    return {
         "contents": [{
             "parts": [{
                 "text": prompt
@@ -58,64 +172,348 @@ Make the descriptions engaging and suitable for an e-commerce website."""
         }]
     }
 
+def _response_text(result):
+    """Text of the first candidate in a Gemini response, or None"""
+    if 'candidates' in result and result['candidates']:
+        content = result['candidates'][0].get('content', {})
+        if 'parts' in content and content['parts']:
+            return content['parts'][0].get('text', '')
+    return None
+
+def _parse_description_lines(text):
+    """Return (short, full) from SHORT:/FULL: lines"""
+    short_desc = ""
+    full_desc = ""
+    
+    for line in text.strip().split('\n'):
+        if line.startswith('SHORT:'):
+            short_desc = line.replace('SHORT:', '').strip()
+        elif line.startswith('FULL:'):
+            full_desc = line.replace('FULL:', '').strip()
+    
+    return short_desc, full_desc
+
+def _parse_description_response(result):
+    """Pull the SHORT:/FULL: lines out of a Gemini response, or None if either is missing"""
+    text = _response_text(result)
+    if text is None:
+        return None
+    short_desc, full_desc = _parse_description_lines(text)
+    return (short_desc, full_desc) if short_desc and full_desc else None
+
+def _parse_batch_description_response(result, categories):
+    """Return {category: (short, full)} for the blocks found in a batch response"""
+    text = _response_text(result)
+    if not text:
+        return {}
+    
+    markers = list(_BATCH_INDEX_RE.finditer(text))
+    descriptions = {}
+    for marker, next_marker in zip(markers, markers[1:] + [None]):
+        index = int(marker.group(1)) - 1
+        if not 0 <= index < len(categories):
+            continue
+        block = text[marker.end():next_marker.start() if next_marker else len(text)]
+        short_desc, full_desc = _parse_description_lines(block)
+        if short_desc and full_desc:
+            descriptions[categories[index]] = (short_desc, full_desc)
+    return descriptions
+
+def _description_batches(categories, cache):
+    """Uncached categories, split into DESCRIPTION_BATCH_SIZE groups"""
+    missing = [category for category in categories if _cached_descriptions(cache, category) is None]
+    return [missing[i:i + DESCRIPTION_BATCH_SIZE] for i in range(0, len(missing), DESCRIPTION_BATCH_SIZE)]
+
+def _fallback_descriptions(category):
+    return f"Quality {category} products", f"Discover our selection of {category} products with competitive prices and excellent quality"
+
+def _description_cache_key(category):
+    """Cache key covering the model endpoint, so switching models invalidates entries"""
+    return f"{GEMINI_BASE_URL}|{category}"
+
+def _load_description_cache():
+    try:
+        with open(DESCRIPTION_CACHE_PATH, 'rb') as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+def _save_description_cache(cache):
+    try:
+        with open(DESCRIPTION_CACHE_PATH, 'wb') as f:
+            f.write(_json_dumps(cache, indent=True))
+    except OSError as e:
+        print(f"⚠️  Could not save description cache: {e}")
+
+def _cached_descriptions(cache, category):
+    """
+    (short, full) for a cached category, the fallback for one whose request
+    failed recently, or None when Gemini should be asked
+    """
+    entry = cache.get(_description_cache_key(category)) if cache is not None else None
+    if isinstance(entry, list):
+        return tuple(entry)
+    if isinstance(entry, dict) and time.time() - entry.get('failed_at', 0) < DESCRIPTION_RETRY_AFTER:
+        return _fallback_descriptions(category)
+    return None
+
+def _cache_descriptions(cache, category, descriptions):
+    """Store generated descriptions, or a failure marker when there are none"""
+    if cache is not None:
+        key = _description_cache_key(category)
+        cache[key] = list(descriptions) if descriptions else {'failed_at': time.time()}
+
+# Set once Gemini answers with a GEMINI_UNAVAILABLE_STATUSES status
+_gemini_unavailable = threading.Event()
+
+def generate_category_descriptions(category, cache=None):
+    """
+    Generate short description and full description for a category using Gemini AI.
+    With a cache dict, cached categories skip the API and new results are added to it;
+    failures are remembered for DESCRIPTION_RETRY_AFTER seconds and get the fallback
+    """
+    cached = _cached_descriptions(cache, category)
+    if cached is not None:
+        return cached
+    
+    descriptions = None
+    if not _gemini_unavailable.is_set():
+        try:
+            response = _gemini_session.post(GEMINI_BASE_URL, headers=_gemini_headers(), data=_json_dumps(_description_request(category)), timeout=GEMINI_TIMEOUT)
+            if response.status_code == 200:
+                descriptions = _parse_description_response(_json_loads(response.content))
+            else:
+                print(f"Gemini API error: {response.status_code}")
+                if response.status_code in GEMINI_UNAVAILABLE_STATUSES:
+                    _gemini_unavailable.set()
+        except Exception as e:
+            print(f"Error generating descriptions: {e}")
+    
+    _cache_descriptions(cache, category, descriptions)
+    return descriptions or _fallback_descriptions(category)
+
+async def generate_category_descriptions_async(session, category, cache=None):
+    """
+    Same as generate_category_descriptions, on a shared aiohttp session
+    """
+    cached = _cached_descriptions(cache, category)
+    if cached is not None:
+        return cached
+    
+    descriptions = None
+    if not _gemini_unavailable.is_set():
+        try:
+            async with session.post(GEMINI_BASE_URL, headers=_gemini_headers(), data=_json_dumps(_description_request(category)),
+                                    timeout=aiohttp.ClientTimeout(total=GEMINI_TIMEOUT)) as response:
+                if response.status == 200:
+                    descriptions = _parse_description_response(_json_loads(await response.read()))
+                else:
+                    print(f"Gemini API error: {response.status}")
+                    if response.status in GEMINI_UNAVAILABLE_STATUSES:
+                        _gemini_unavailable.set()
+        except Exception as e:
+            print(f"Error generating descriptions: {e}")
+    
+    _cache_descriptions(cache, category, descriptions)
+    return descriptions or _fallback_descriptions(category)
+
+def generate_batch_descriptions(categories, cache):
+    """
+    Ask Gemini for several categories' descriptions in one request and add the
+    ones it answered to the cache; the rest are left for generate_category_descriptions
+    """
+    if _gemini_unavailable.is_set():
+        return
     try:
-        response = requests.post(GEMINI_BASE_URL, headers=headers, json=data)
+        response = _gemini_session.post(GEMINI_BASE_URL, headers=_gemini_headers(), data=_json_dumps(_batch_description_request(categories)), timeout=GEMINI_TIMEOUT)
         if response.status_code == 200:
-            result = response.json()
-            if 'candidates' in result and result['candidates']:
-                content = result['candidates'][0].get('content', {})
-                if 'parts' in content and content['parts']:
-                    text = content['parts'][0].get('text', '')
-                    
-                    # Parse the response
-                    lines = text.strip().split('\n')
-                    short_desc = ""
-                    full_desc = ""
-                    
-                    for line in lines:
-                        if line.startswith('SHORT:'):
-                            short_desc = line.replace('SHORT:', '').strip()
-                        elif line.startswith('FULL:'):
-                            full_desc = line.replace('FULL:', '').strip()
-                    
-                    return short_desc, full_desc
+            for category, descriptions in _parse_batch_description_response(_json_loads(response.content), categories).items():
+                _cache_descriptions(cache, category, descriptions)
         else:
             print(f"Gemini API error: {response.status_code}")
+            if response.status_code in GEMINI_UNAVAILABLE_STATUSES:
+                _gemini_unavailable.set()
+    except Exception as e:
+        print(f"Error generating descriptions: {e}")
+
+async def generate_batch_descriptions_async(session, categories, cache):
+    """
+    Same as generate_batch_descriptions, on a shared aiohttp session
+    """
+    if _gemini_unavailable.is_set():
+        return
+    try:
+        async with session.post(GEMINI_BASE_URL, headers=_gemini_headers(), data=_json_dumps(_batch_description_request(categories)),
+                                timeout=aiohttp.ClientTimeout(total=GEMINI_TIMEOUT)) as response:
+            if response.status == 200:
+                result = _json_loads(await response.read())
+                for category, descriptions in _parse_batch_description_response(result, categories).items():
+                    _cache_descriptions(cache, category, descriptions)
+            else:
+                print(f"Gemini API error: {response.status}")
+                if response.status in GEMINI_UNAVAILABLE_STATUSES:
+                    _gemini_unavailable.set()
     except Exception as e:
         print(f"Error generating descriptions: {e}")
-    
-    return f"Quality {category} products", f"Discover our selection of {category} products with competitive prices and excellent quality"
+
+# Numeric tokens in a price string, with optional thousands separators
+# (or a bare fraction like ".99")
+_PRICE_RE = re.compile(r'\d[\d,]*(?:\.\d+)?|\.\d+')
 
 def clean_price(price_str, price_multiplier):
     """
     Clean the price string and multiply by the given price multiplier
-    1. Remove currency symbols ($ or £) and commas
-    2. Convert to float  
+    1. Pull out the numbers, skipping currency symbols ($ or £) and commas
+    2. Take the higher one for variable prices
     3. Multiply by the price multiplier
     4. Return as Rs (Indian Rupees)
     """
+    if not isinstance(price_str, str):
+        return price_str
+    
+    # Handle variable prices like "£15.74 to £150.00" or "$15.74 to $150.00"
+    numbers = [float(match.replace(',', '')) for match in _PRICE_RE.findall(price_str)]
+    if not numbers:
+        print(f"Error processing price {price_str.strip()}: no number found")
+        return price_str.strip()  # Return original string if processing fails
+    
+    # Return formatted price without currency symbol
+    return f"{max(numbers) * price_multiplier:.2f}"
+
+def clean_prices(prices, price_multiplier):
+    """clean_price over a whole list of price strings"""
+    return [clean_price(price, price_multiplier) for price in prices]
+
+_NON_WORD_RE = re.compile(r'\W+')
+
+# Numeric item ID in /itm/123456 and older /itm/title-slug/123456 links
+_ITM_ID_RE = re.compile(r'/itm/(?:[^/?#]+/)?(\d+)')
+
+def _item_id(link):
+    """eBay item ID from a product link, or None"""
+    match = _ITM_ID_RE.search(link or '')
+    return match.group(1) if match else None
+
+def _title_fingerprint(title):
+    """8-byte dedup key that ignores case, punctuation and spacing differences"""
+    return blake2b(_NON_WORD_RE.sub('', title.lower()).encode(), digest_size=8).digest()
+
+# Text nodes BeautifulSoup's get_text() would return (script/style excluded)
+_TEXT_NODES_XPATH = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+def _declared_charset(content_type):
+    """Charset named in a Content-Type header, or None to let lxml read the <meta> tag"""
+    match = _CHARSET_RE.search(content_type or '')
+    return match.group(1) if match else None
+
+# One reusable parser per thread and encoding: lxml serializes work on a
+# shared parser, and reusing one skips building a new parser context per page
+_thread_parsers = threading.local()
+
+def _html_parser(encoding=None):
+    parsers = getattr(_thread_parsers, 'by_encoding', None)
+    if parsers is None:
+        parsers = _thread_parsers.by_encoding = {}
+    parser = parsers.get(encoding)
+    if parser is None:
+        # The id index is never queried, so don't build it
+        parser = parsers[encoding] = lxml_html.HTMLParser(encoding=encoding, collect_ids=False)
+    return parser
+
+def _html_tree(html, encoding=None):
+    """
+    Parse a results page with lxml; None when there is nothing to parse.
+    Bytes are decoded by libxml2 using the given charset, else the page's <meta> tag
+    """
     try:
-        # Remove any whitespace
-        price_str = price_str.strip()
-        
-        # Handle variable prices like "£15.74 to £150.00" or "$15.74 to $150.00"
-        if " to " in price_str:
-            # Split and take the higher price
-            prices = price_str.split(" to ")
-            # Remove currency symbols for comparison
-            price_str = max(prices, key=lambda x: float(x.replace("£", "").replace("$", "").replace(",", "")))
-        
-        # Remove currency symbols (£, $) and any commas
-        price_float = float(price_str.replace("£", "").replace("$", "").replace(",", ""))
-        
-        # Multiply price by the provided multiplier to convert to Rs
-        final_price = price_float * price_multiplier
-        
-        # Return formatted price without currency symbol
-        return f"{final_price:.2f}"
-    except (ValueError, AttributeError) as e:
-        print(f"Error processing price {price_str}: {e}")
-        return price_str  # Return original string if processing fails
+        if isinstance(html, bytes):
+            try:
+                return lxml_html.fromstring(html, parser=_html_parser(encoding))
+            except LookupError:
+                # Unknown charset in the header
+                return lxml_html.fromstring(html, parser=_html_parser())
+        return lxml_html.fromstring(html, parser=_html_parser())
+    except ValueError:
+        # Unicode input carrying an XML encoding declaration
+        return lxml_html.fromstring(html.encode('utf-8'), parser=_html_parser())
+    except etree.ParserError:
+        return None
+
+def _element_text(elem, strip=False):
+    """Equivalent of BeautifulSoup's get_text() / get_text(strip=True)."""
+    texts = _TEXT_NODES_XPATH(elem)
+    if strip:
+        return ''.join(text.strip() for text in texts)
+    return ''.join(texts)
+
+def _single_string(elem):
+    """Equivalent of BeautifulSoup's tag.string: the lone string child, if any."""
+    while True:
+        children = list(elem)
+        if not children:
+            return elem.text
+        if len(children) > 1 or elem.text or children[0].tail:
+            return None
+        elem = children[0]
+
+def _has_dollar(string):
+    """Matches a mobile price span's lone string (see _single_string)."""
+    return bool(string) and '$' in string
+
+def _first_match(candidates, predicates):
+    """First candidate (document order) satisfying the earliest predicate."""
+    for predicate in predicates:
+        for candidate in candidates:
+            if predicate(candidate):
+                return candidate
+    return None
+
+def _retry_after(response):
+    """
+    Seconds an aiohttp 429/503 response asks us to wait, capped at
+    MAX_RETRY_AFTER; None when there is no usable Retry-After header
+    """
+    if response.status not in (429, 503):
+        return None
+    try:
+        delay = int(response.headers.get('Retry-After', ''))
+    except ValueError:
+        # Missing, or an HTTP-date; keep the default backoff
+        return None
+    return min(max(delay, 0), MAX_RETRY_AFTER)
+
+class RateLimiter:
+    """
+    Token bucket shared by search threads or tasks: bursts of up to `rate`
+    requests, then `rate` per second
+    """
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _reserve(self):
+        """Take a token and return how long to wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+    
+    def wait(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+    
+    async def wait_async(self):
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
 
 class EbayScraper:
     def __init__(self):
@@ -135,8 +533,81 @@ class EbayScraper:
             'Upgrade-Insecure-Requests': '1'
         }
         self.session.headers.update(self.headers)
+        # Keep-alive connections are reused across searches; connection
+        # errors, 429s and 503s are retried with backoff or their Retry-After,
+        # capped at MAX_RETRY_AFTER like the aiohttp searches
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=10, pool_maxsize=20,
+            max_retries=_CappedRetry(total=3, backoff_factor=2, status_forcelist=[429, 503])))
+        self.rate_limiter = RateLimiter(EBAY_REQUESTS_PER_SECOND)
+        self.browse_token = EBAY_BROWSE_TOKEN
+
+    def _browse_request(self, query, max_results_per_keyword):
+        """URL params and headers for a Browse API item_summary search"""
+        params = {'q': query, 'limit': min(max(max_results_per_keyword, 1), 200)}
+        headers = {
+            'Authorization': f'Bearer {self.browse_token}',
+            'X-EBAY-C-MARKETPLACE-ID': EBAY_MARKETPLACE_ID,
+            'Accept': 'application/json',
+        }
+        return params, headers
+
+    def _parse_browse_results(self, data, max_results_per_keyword):
+        """Turn a Browse API response into the same item dicts _parse_results returns"""
+        items = []
+        for summary in data.get('itemSummaries', [])[:max_results_per_keyword]:
+            title = summary.get('title')
+            if not title:
+                continue
+            price = "N/A"
+            price_info = summary.get('price') or {}
+            if price_info.get('value'):
+                currency = price_info.get('currency', '')
+                symbol = CURRENCY_SYMBOLS.get(currency)
+                price = f"{symbol}{price_info['value']}" if symbol else f"{price_info['value']} {currency}".strip()
+            items.append({
+                'title': title,
+                'prdid': summary.get('legacyItemId') or summary.get('itemId') or "N/A",
+                'price': price,
+                'imagelink': (summary.get('image') or {}).get('imageUrl') or "No image"
+            })
+        print(f"Parsed {len(items)} items from Browse API")
+        return items
+
+    def _try_browse_search(self, query, max_results_per_keyword):
+        print(f"Trying eBay Browse API search: {query}")
+        params, headers = self._browse_request(query, max_results_per_keyword)
+        try:
+            self.rate_limiter.wait()
+            response = self.session.get(EBAY_BROWSE_URL, params=params, headers=headers, timeout=20)
+            if response.status_code == 200:
+                return self._parse_browse_results(_json_loads(response.content), max_results_per_keyword)
+            print(f"Browse API search: Got status {response.status_code}")
+        except Exception as e:
+            print(f"Browse API search error: {e}")
+        return []
+
+    async def _try_browse_search_async(self, session, query, max_results_per_keyword):
+        print(f"Trying eBay Browse API search: {query}")
+        params, headers = self._browse_request(query, max_results_per_keyword)
+        try:
+            await self.rate_limiter.wait_async()
+            async with session.get(EBAY_BROWSE_URL, params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=20)) as response:
+                if response.status == 200:
+                    return self._parse_browse_results(_json_loads(await response.read()), max_results_per_keyword)
+                print(f"Browse API search: Got status {response.status}")
+        except Exception as e:
+            print(f"Browse API search error: {e}")
+        return []
 
     def search(self, query, max_results_per_keyword):
+        # Structured results from the Browse API skip HTML parsing entirely
+        if self.browse_token:
+            browse_results = self._try_browse_search(query, max_results_per_keyword)
+            if browse_results:
+                return browse_results
+            print("Browse API failed, scraping search results instead...")
+        
         # Try eBay UK desktop version first
         desktop_results = self._try_desktop_search(query, max_results_per_keyword)
         if desktop_results:
@@ -149,63 +620,141 @@ class EbayScraper:
         url = self.base_url.format(quote_plus(query))
         print(f"Trying eBay UK desktop search: {url}")
         
+        # Connection errors, 429s and 503s are retried with backoff by the
+        # session; a block page is retried here, as the aiohttp search does
         for attempt in range(3):
             try:
                 if attempt > 0:
                     print(f"Desktop retry {attempt + 1}...")
                     time.sleep(2 * attempt)
                 
+                self.rate_limiter.wait()
                 response = self.session.get(url, timeout=20)
                 
                 if response.status_code == 200:
+                    # Raw bytes go straight to lxml, skipping requests' decode
+                    html = response.content
                     # Check if we're blocked
-                    if "Pardon Our Interruption" in response.text:
+                    if b"Pardon Our Interruption" in html:
                         print("eBay UK desktop is blocking requests")
                         continue
-                    return self._parse_results(response.text, max_results_per_keyword)
+                    return self._parse_results(
+                        html, max_results_per_keyword, _declared_charset(response.headers.get('Content-Type')))
                 else:
-                    print(f"Desktop attempt {attempt + 1}: Got status {response.status_code}")
+                    print(f"Desktop search: Got status {response.status_code}")
+                    break
+                    
+            except Exception as e:
+                print(f"Desktop search error: {e}")
+                break
+            
+        return []
+    
+    def _try_mobile_search(self, query, max_results_per_keyword):
+        url = self.mobile_url.format(quote_plus(query))
+        print(f"Trying mobile eBay UK search: {url}")
+        
+        try:
+            self.rate_limiter.wait()
+            response = self.session.get(url, timeout=20)
+            
+            if response.status_code == 200:
+                return self._parse_mobile_results(
+                    response.content, max_results_per_keyword, _declared_charset(response.headers.get('Content-Type')))
+            else:
+                print(f"Mobile search: Got status {response.status_code}")
+                
+        except Exception as e:
+            print(f"Mobile search error: {e}")
+            
+        return []
+
+    async def search_async(self, session, query, max_results_per_keyword):
+        """Same as search, on a shared aiohttp session"""
+        if self.browse_token:
+            browse_results = await self._try_browse_search_async(session, query, max_results_per_keyword)
+            if browse_results:
+                return browse_results
+            print("Browse API failed, scraping search results instead...")
+        
+        desktop_results = await self._try_desktop_search_async(session, query, max_results_per_keyword)
+        if desktop_results:
+            return desktop_results
+            
+        print("Desktop version failed, trying mobile version...")
+        return await self._try_mobile_search_async(session, query, max_results_per_keyword)
+    
+    async def _try_desktop_search_async(self, session, query, max_results_per_keyword):
+        url = self.base_url.format(quote_plus(query))
+        print(f"Trying eBay UK desktop search: {url}")
+        
+        retry_after = None
+        for attempt in range(3):
+            try:
+                if attempt > 0:
+                    print(f"Desktop retry {attempt + 1}...")
+                    await asyncio.sleep(2 * attempt if retry_after is None else retry_after)
+                
+                await self.rate_limiter.wait_async()
+                async with session.get(url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=20)) as response:
+                    if response.status == 200:
+                        html = await response.read()
+                        # Check if we're blocked
+                        if b"Pardon Our Interruption" in html:
+                            print("eBay UK desktop is blocking requests")
+                            continue
+                        # Parse in the loop's executor so other responses keep arriving
+                        return await asyncio.get_running_loop().run_in_executor(
+                            None, self._parse_results, html, max_results_per_keyword, response.charset)
+                    else:
+                        print(f"Desktop attempt {attempt + 1}: Got status {response.status}")
+                        retry_after = _retry_after(response)
                     
             except Exception as e:
                 print(f"Desktop attempt {attempt + 1} error: {e}")
                 
         return []
     
-    def _try_mobile_search(self, query, max_results_per_keyword):
+    async def _try_mobile_search_async(self, session, query, max_results_per_keyword):
         url = self.mobile_url.format(quote_plus(query))
         print(f"Trying mobile eBay UK search: {url}")
         
+        retry_after = None
         for attempt in range(2):
             try:
                 if attempt > 0:
                     print(f"Mobile retry {attempt + 1}...")
-                    time.sleep(3)
+                    await asyncio.sleep(3 if retry_after is None else retry_after)
                 
-                response = self.session.get(url, timeout=20)
-                
-                if response.status_code == 200:
-                    return self._parse_mobile_results(response.text, max_results_per_keyword)
-                else:
-                    print(f"Mobile attempt {attempt + 1}: Got status {response.status_code}")
+                await self.rate_limiter.wait_async()
+                async with session.get(url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=20)) as response:
+                    if response.status == 200:
+                        html = await response.read()
+                        return await asyncio.get_running_loop().run_in_executor(
+                            None, self._parse_mobile_results, html, max_results_per_keyword, response.charset)
+                    else:
+                        print(f"Mobile attempt {attempt + 1}: Got status {response.status}")
+                        retry_after = _retry_after(response)
                     
             except Exception as e:
                 print(f"Mobile attempt {attempt + 1} error: {e}")
                 
         return []
 
-    def _parse_mobile_results(self, html, max_results_per_keyword):
-        soup = BeautifulSoup(html, 'lxml')
+    def _parse_mobile_results(self, html, max_results_per_keyword, encoding=None):
+        tree = _html_tree(html, encoding)
         items = []
         
         print("Parsing mobile eBay results...")
         
         # Mobile eBay uses different structure
         # Try multiple selectors for mobile
-        mobile_items = soup.find_all('div', class_='s-item')
-        if not mobile_items:
-            mobile_items = soup.find_all('div', {'data-view': 'mi:1686|iid:1'})
-        if not mobile_items:
-            mobile_items = soup.find_all('div', class_='item')
+        mobile_items = []
+        if tree is not None:
+            for xpath in self._MOBILE_ITEM_XPATHS:
+                mobile_items = xpath(tree)
+                if mobile_items:
+                    break
         
         print(f"Found {len(mobile_items)} mobile items")
         
@@ -213,46 +762,37 @@ class EbayScraper:
             try:
                 # Mobile title extraction
                 title = None
-                title_elem = item.find('h3')
-                if not title_elem:
-                    title_elem = item.find('span', class_='it-ttl')
-                if not title_elem:
-                    title_elem = item.find('a')
-                    
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
+                for xpath in self._MOBILE_TITLE_XPATHS:
+                    title_elem = xpath(item)
+                    if title_elem:
+                        title = _element_text(title_elem[0], strip=True)
+                        break
                     
                 if not title or len(title) < 5 or "Shop on eBay" in title:
                     continue
                 
                 # Mobile price extraction
                 price = "N/A"
-                price_elem = item.find('span', class_='notranslate')
-                if not price_elem:
-                    price_elem = item.find('span', string=lambda x: x and '$' in str(x) if x else False)
+                price_elem = self._MOBILE_PRICE_XPATH(item)
                 if price_elem:
-                    price = price_elem.get_text(strip=True)
+                    price_elem = price_elem[0]
+                else:
+                    price_elem = next(
+                        (span for span in self._SPAN_XPATH(item) if _has_dollar(_single_string(span))), None)
+                if price_elem is not None:
+                    price = _element_text(price_elem, strip=True)
                 
                 # Mobile image extraction
                 imagelink = None
-                img_elem = item.find('img')
+                img_elem = self._IMG_XPATH(item)
                 if img_elem:
-                    imagelink = img_elem.get('src') or img_elem.get('data-src')
+                    imagelink = img_elem[0].get('src') or img_elem[0].get('data-src')
                 
                 # Mobile product link
-                link_elem = item.find('a', href=True)
+                link_elem = self._MOBILE_LINK_XPATH(item)
                 prdid = "N/A"
                 if link_elem:
-                    href = link_elem.get('href', '')
-                    if '/itm/' in href:
-                        try:
-                            start = href.find('/itm/') + 5
-                            end = href.find('?', start)
-                            if end == -1:
-                                end = len(href)
-                            prdid = href[start:end]
-                        except:
-                            pass
+                    prdid = _item_id(link_elem[0].get('href')) or "N/A"
                 
                 items.append({
                     'title': title,
@@ -271,25 +811,72 @@ class EbayScraper:
         print(f"Successfully parsed {len(items)} mobile items")
         return items
 
-    def _parse_results(self, html, max_results_per_keyword):
-        soup = BeautifulSoup(html, 'lxml')
+    # Compiled once; class tokens are matched the way BeautifulSoup's
+    # class_='x' does, substrings the way its lambda matchers did
+    _RESULTS_LIST_XPATH = etree.XPath(
+        "(//ul[contains(concat(' ', normalize-space(@class), ' '), ' srp-results ')])[1]")
+    _ITEM_LINKS_XPATH = etree.XPath(".//a[contains(@href, '/itm/')]")
+    _TITLE_XPATH = etree.XPath(
+        "(.//h3[contains(@class, 's-item__title')] | .//span[@role='heading'] | .//h3)")
+    _PRICE_XPATH = etree.XPath(".//span[contains(@class, 's-item__price')]")
+    _SPAN_XPATH = etree.XPath(".//span")
+    _IMG_XPATH = etree.XPath("(.//img)[1]")
+    _WRAPPER_XPATH = etree.XPath(
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' s-item__wrapper ')]")
+    _WRAPPER_TITLE_XPATH = etree.XPath(
+        "(.//div[contains(concat(' ', normalize-space(@class), ' '), ' s-item__title ')])[1]"
+        " | (.//h3[contains(concat(' ', normalize-space(@class), ' '), ' s-item__title ')])[1]")
+    _WRAPPER_PRICE_XPATH = etree.XPath(
+        "(.//span[contains(concat(' ', normalize-space(@class), ' '), ' s-item__price ')])[1]")
+    _FIRST_LINK_XPATH = etree.XPath("(.//a)[1]")
+    # Mobile layout: item containers tried in order, then per-item fields
+    _MOBILE_ITEM_XPATHS = (
+        etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' s-item ')]"),
+        etree.XPath("//div[@data-view='mi:1686|iid:1']"),
+        etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' item ')]"),
+    )
+    _MOBILE_TITLE_XPATHS = (
+        etree.XPath("(.//h3)[1]"),
+        etree.XPath("(.//span[contains(concat(' ', normalize-space(@class), ' '), ' it-ttl ')])[1]"),
+        _FIRST_LINK_XPATH,
+    )
+    _MOBILE_PRICE_XPATH = etree.XPath(
+        "(.//span[contains(concat(' ', normalize-space(@class), ' '), ' notranslate ')])[1]")
+    _MOBILE_LINK_XPATH = etree.XPath("(.//a[@href])[1]")
+    # Which title candidate wins, tried in order
+    _TITLE_PRIORITY = (
+        lambda e: e.tag == 'h3' and 's-item__title' in (e.get('class') or ''),
+        lambda e: e.tag == 'span',
+        lambda e: e.tag == 'h3',
+    )
+    _WRAPPER_TITLE_PRIORITY = (
+        lambda e: e.tag == 'div',
+        lambda e: e.tag == 'h3',
+    )
+
+    def _parse_results(self, html, max_results_per_keyword, encoding=None):
+        tree = _html_tree(html, encoding)
         items = []
+        if tree is None:
+            print("Parsed 0 items")
+            return items
         
         # Method 1: Try the current eBay structure (ul.srp-results > li)
-        results_list = soup.find('ul', class_='srp-results')
+        results_list = self._RESULTS_LIST_XPATH(tree)
         if results_list:
-            # Get all li items (can be s-card or other classes)
-            list_items = results_list.find_all('li', recursive=False)[:max_results_per_keyword * 2]
+            # Get the li items (can be s-card or other classes), wrapping
+            # only as many children as can be used
+            list_items = list(islice(results_list[0].iterchildren('li'), max_results_per_keyword * 2))
             print(f"Found {len(list_items)} items in results list")
             
             for item_li in list_items:
                 try:
                     # Skip if it's an ad or sponsored item
-                    if 'srp-river-answer' in str(item_li.get('class', [])):
+                    if 'srp-river-answer' in (item_li.get('class') or ''):
                         continue
                     
                     # Find the main product link (usually has aria-label with title)
-                    links = item_li.find_all('a', href=lambda x: x and '/itm/' in x if x else False)
+                    links = self._ITEM_LINKS_XPATH(item_li)
                     
                     title = None
                     prdlink = None
@@ -297,7 +884,7 @@ class EbayScraper:
                     
                     # Try to find the main product link - prioritize links with actual text content
                     for link in links:
-                        link_text = link.get_text(strip=True)
+                        link_text = _element_text(link, strip=True)
                         aria_label = link.get('aria-label', '')
                         
                         # Skip image-only links and watch buttons
@@ -317,14 +904,10 @@ class EbayScraper:
                         link = links[0]  # Use first link
                         prdlink = link.get('href', '')
                         
-                        # Try to find title in h3 or span
-                        title_elem = item_li.find('h3', class_=lambda x: x and 's-item__title' in str(x) if x else False)
-                        if not title_elem:
-                            title_elem = item_li.find('span', {'role': 'heading'})
-                        if not title_elem:
-                            title_elem = item_li.find('h3')
-                        if title_elem:
-                            title = title_elem.get_text(strip=True)
+                        # Try to find title in h3.s-item__title, span[role=heading], then any h3
+                        title_elem = _first_match(self._TITLE_XPATH(item_li), self._TITLE_PRIORITY)
+                        if title_elem is not None:
+                            title = _element_text(title_elem, strip=True)
                     
                     # Skip items starting with "watch" (these are watch buttons)
                     if title and title.startswith('watch'):
@@ -341,31 +924,31 @@ class EbayScraper:
                     
                     # Extract product ID from link
                     if prdlink:
-                        start_index = prdlink.find("/itm/")
-                        end_index = prdlink.find("?")
-                        if end_index == -1:
-                            end_index = len(prdlink)
-                        prdid = prdlink[start_index+5:end_index] if start_index != -1 else None
+                        prdid = _item_id(prdlink)
                     
                     # Find price within the li - look for any text with £ or $
                     price = "N/A"
-                    price_elem = item_li.find('span', class_=lambda x: x and 's-item__price' in str(x) if x else False)
-                    if not price_elem:
-                        # Try finding any span with pound or dollar sign
-                        price_spans = item_li.find_all('span', string=lambda x: x and ('£' in str(x) or '$' in str(x)) if x else False)
-                        for span in price_spans:
-                            text = span.get_text(strip=True)
+                    price_elems = self._PRICE_XPATH(item_li)
+                    price_elem = price_elems[0] if price_elems else None
+                    if price_elem is None:
+                        # Try finding any span whose only string has a pound or dollar sign
+                        for span in self._SPAN_XPATH(item_li):
+                            string = _single_string(span)
+                            if not string or ('£' not in string and '$' not in string):
+                                continue
+                            text = _element_text(span, strip=True)
                             if (text.startswith('£') or text.startswith('$')) and 'shipping' not in text.lower():
                                 price_elem = span
                                 break
                     
-                    if price_elem:
-                        price = price_elem.get_text(strip=True)
+                    if price_elem is not None:
+                        price = _element_text(price_elem, strip=True)
                     
                     # Find image within the li
                     imagelink = None
-                    img_elem = item_li.find('img')
-                    if img_elem:
+                    img_elems = self._IMG_XPATH(item_li)
+                    if img_elems:
+                        img_elem = img_elems[0]
                         imagelink = img_elem.get('src') or img_elem.get('data-src') or img_elem.get('data-defer-load')
                     
                     items.append({
@@ -384,40 +967,32 @@ class EbayScraper:
         
         # Method 2: Fallback - try old structure div.s-item__wrapper
         if not items:
-            old_listings = soup.find_all('div', {'class': 's-item__wrapper'})
+            old_listings = self._WRAPPER_XPATH(tree)
             if old_listings:
                 print(f"Using fallback method, found {len(old_listings)} items")
                 for listing in old_listings[:max_results_per_keyword]:
                     try:
-                        # Extract title
-                        title_elem = listing.find('div', {'class': 's-item__title'})
-                        if not title_elem:
-                            title_elem = listing.find('h3', {'class': 's-item__title'})
-                        title = title_elem.text.strip() if title_elem else None
+                        # Extract title (div.s-item__title, else h3.s-item__title)
+                        title_elem = _first_match(self._WRAPPER_TITLE_XPATH(listing), self._WRAPPER_TITLE_PRIORITY)
+                        title = _element_text(title_elem).strip() if title_elem is not None else None
                         
                         if not title or "Shop on eBay" in title:
                             continue
                         
                         # Extract price
-                        price_elem = listing.find('span', {'class': 's-item__price'})
-                        price = price_elem.text.strip() if price_elem else "N/A"
+                        price_elems = self._WRAPPER_PRICE_XPATH(listing)
+                        price = _element_text(price_elems[0]).strip() if price_elems else "N/A"
                         price = price.replace("$ ", "$")
 
                         # Get the product image URL
-                        image_elem = listing.find("img")
-                        imagelink = image_elem.get('data-defer-load') if image_elem else None
+                        image_elems = self._IMG_XPATH(listing)
+                        imagelink = image_elems[0].get('data-defer-load') if image_elems else None
 
                         # Get the product ID
-                        prdlink_elem = listing.find("a")
+                        prdlink_elems = self._FIRST_LINK_XPATH(listing)
                         prdid = None
-                        if prdlink_elem:
-                            prdlink = prdlink_elem.get('href')
-                            if prdlink and "/itm/" in prdlink:
-                                start_index = prdlink.find("/itm/")
-                                end_index = prdlink.find("?")
-                                if end_index == -1:
-                                    end_index = len(prdlink)
-                                prdid = str(prdlink[start_index+5:end_index])
+                        if prdlink_elems:
+                            prdid = _item_id(prdlink_elems[0].get('href'))
 
                         items.append({
                             'title': title,
@@ -432,17 +1007,117 @@ class EbayScraper:
         print(f"Parsed {len(items)} items")
         return items
 
+def generate_all_category_descriptions(categories, description_cache):
+    """
+    Generate every uncached category's descriptions at once, in batched
+    prompts sent from threads. Returns {category: {'short': ..., 'full': ...}}
+    """
+    categories = list(dict.fromkeys(categories))
+    batches = _description_batches(categories, description_cache)
+    missing = sum(len(batch) for batch in batches)
+    print(f"Generating descriptions for {missing} categories ({len(categories) - missing} cached)...")
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda batch: generate_batch_descriptions(batch, description_cache), batches))
+        # Categories missing from a batch answer are asked for one by one
+        descriptions = list(executor.map(
+            lambda category: generate_category_descriptions(category, description_cache), categories))
+    
+    if missing:
+        _save_description_cache(description_cache)
+    
+    return {
+        category: {'short': short_desc, 'full': full_desc}
+        for category, (short_desc, full_desc) in zip(categories, descriptions)
+    }
+
+def search_keywords(scraper, keywords, max_results_per_keyword, description_cache):
+    """
+    Start the keyword searches in 8 threads, then generate every uncached
+    category's descriptions while they run.
+    Returns (category descriptions, iterator of (keyword, results) in
+    keyword order); closing the iterator cancels searches not yet started.
+    """
+    print(f"Searching eBay for {len(keywords)} keywords...")
+    executor = ThreadPoolExecutor(max_workers=8)
+    futures = [executor.submit(scraper.search, keyword, max_results_per_keyword) for keyword in keywords]
+    try:
+        category_descriptions = generate_all_category_descriptions(keywords, description_cache)
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    
+    def ordered_results():
+        try:
+            for keyword, future in zip(keywords, futures):
+                yield keyword, future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    return category_descriptions, ordered_results()
+
+async def search_keywords_async(scraper, keywords, max_results_per_keyword, description_cache, handle_results):
+    """
+    Run the keyword searches concurrently, at most 8 requests at a time, and
+    pass each keyword's results to handle_results(keyword, results,
+    descriptions) in keyword order as soon as they are in. Uncached
+    categories are described in batched prompts while the searches run;
+    categories missing from a batch answer are only asked for one by one
+    when their keyword has results. Once handle_results returns True the
+    remaining searches are cancelled.
+    """
+    semaphore = asyncio.Semaphore(8)
+    categories = list(dict.fromkeys(keywords))
+    batches = _description_batches(categories, description_cache)
+    missing = sum(len(batch) for batch in batches)
+    
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+    
+    # Result pages are parsed on these threads (lxml releases the GIL while
+    # building the tree); asyncio.run shuts the pool down on exit
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=os.cpu_count() or 1))
+    
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=20)) as session:
+        print(f"Generating descriptions for {missing} categories ({len(categories) - missing} cached) and searching eBay for {len(keywords)} keywords...")
+        describe = asyncio.ensure_future(asyncio.gather(
+            *(limited(generate_batch_descriptions_async(session, batch, description_cache)) for batch in batches)))
+        searches = [asyncio.ensure_future(limited(scraper.search_async(session, keyword, max_results_per_keyword)))
+                    for keyword in keywords]
+        try:
+            for keyword, search in zip(keywords, searches):
+                results = await search
+                descriptions = None
+                if results:
+                    await describe
+                    short_desc, full_desc = await generate_category_descriptions_async(session, keyword, description_cache)
+                    descriptions = {'short': short_desc, 'full': full_desc}
+                if handle_results(keyword, results, descriptions):
+                    break
+        finally:
+            # Don't keep searching or describing for results that are no longer needed
+            for task in [describe, *searches]:
+                task.cancel()
+            await asyncio.gather(describe, *searches, return_exceptions=True)
+            if missing:
+                _save_description_cache(description_cache)
+
 def main():
     # Check for Keywords.csv
     check_keywords_file()
     
-    # Read keywords from CSV
-    with open('Keywords.csv', 'r') as file:
-        reader = csv.DictReader(file)
-        keywords = [row['Keywords'].strip() for row in reader]
-    
-    # Filter out empty keywords
-    keywords = [k for k in keywords if k]
+    # Read keywords from CSV, skipping empty and repeated ones
+    keywords = []
+    seen_keywords = set()
+    with open('Keywords.csv', 'r', newline='') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # header
+        for row in reader:
+            keyword = row[0].strip() if row else ''
+            if keyword and keyword not in seen_keywords:
+                seen_keywords.add(keyword)
+                keywords.append(keyword)
     
     print(f"Keywords to search: {keywords}")
     
@@ -461,77 +1136,69 @@ def main():
     print(f"Using price multiplier: {price_multiplier}")
     
     scraper = EbayScraper()
+    description_cache = _load_description_cache()
     
-    # Dictionary to store unique products (using title as key to avoid duplicates)
-    unique_products = {}
-    
-    # Dictionary to store category descriptions
-    category_descriptions = {}
-    
-    for keyword in keywords:
-        # Generate descriptions for this category once
-        if keyword not in category_descriptions:
-            print(f"Generating descriptions for category: {keyword}")
-            short_desc, full_desc = generate_category_descriptions(keyword)
-            category_descriptions[keyword] = {
-                'short': short_desc,
-                'full': full_desc
-            }
-        
-        print(f"Searching eBay for - {keyword}")
-        results = scraper.search(keyword, max_results_per_keyword)
-        
-        if results:
-            print(f"Found {len(results)} results for {keyword}")
-            for item in results:
-                # Use title as unique key to avoid duplicates
-                unique_key = item['title']
-                if unique_key not in unique_products:
-                    item['category'] = keyword
-                    item['short_description'] = category_descriptions[keyword]['short']
-                    item['description'] = category_descriptions[keyword]['full']
-                    unique_products[unique_key] = item
-                    
-                    # Check if we've reached the total limit
-                    if len(unique_products) >= total_results_limit:
-                        print(f"Reached total results limit of {total_results_limit}")
-                        break
-        else:
-            print("No results found.")
-        
-        # Stop if we've reached the total limit
-        if len(unique_products) >= total_results_limit:
-            break
+    # Products already written, by title fingerprint
+    seen_titles = set()
+    written = 0
+    
+    # Rows are written as each keyword's results come in, so an interrupted
+    # run keeps what it had; an empty result still leaves the header
+    fieldnames = ['Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description']
+    with open('output.csv', 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
         
-        # Small delay between searches
-        time.sleep(1)
-    
-    # Write to CSV
-    if unique_products:
-        with open('output.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        def handle_results(keyword, results, descriptions):
+            """Write a keyword's new products; True once the total limit is reached"""
+            nonlocal written
+            new_items = []
+            if results:
+                print(f"Found {len(results)} results for {keyword}")
+                for item in results:
+                    # Near-identical titles count as the same product
+                    fingerprint = _title_fingerprint(item['title'])
+                    if fingerprint not in seen_titles:
+                        seen_titles.add(fingerprint)
+                        new_items.append(item)
+                        
+                        # Check if we've reached the total limit
+                        if written + len(new_items) >= total_results_limit:
+                            print(f"Reached total results limit of {total_results_limit}")
+                            break
+            else:
+                print("No results found.")
             
-            writer.writeheader()
-            for product in unique_products.values():
-                cleaned_price = clean_price(product['price'], price_multiplier)
-                writer.writerow({
-                    'Image': product['imagelink'],
-                    'Title': product['title'],
-                    'Regular Price': cleaned_price,
-                    'Category': product['category'],
-                    'Short_description': product['short_description'],
-                    'description': product['description']
-                })
+            if new_items:
+                cleaned_prices = clean_prices([item['price'] for item in new_items], price_multiplier)
+                writer.writerows(
+                    (item['imagelink'], item['title'], cleaned_price, keyword,
+                     descriptions['short'], descriptions['full'])
+                    for item, cleaned_price in zip(new_items, cleaned_prices)
+                )
+                csvfile.flush()
+                written += len(new_items)
+            
+            # Stop if we've reached the total limit
+            return written >= total_results_limit
         
-        print(f"Total results written: {len(unique_products)}")
-    else:
-        # Still create empty CSV with headers if no results
-        with open('output.csv', 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Image', 'Title', 'Regular Price', 'Category', 'Short_description', 'description']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-        print("Total results written: 0")
+        # Searches run concurrently with aiohttp when available, otherwise in
+        # threads; results are handled in keyword order either way
+        if AIOHTTP_AVAILABLE:
+            _run_async(search_keywords_async(
+                scraper, keywords, max_results_per_keyword, description_cache, handle_results))
+        else:
+            category_descriptions, keyword_results = search_keywords(
+                scraper, keywords, max_results_per_keyword, description_cache)
+            try:
+                for keyword, results in keyword_results:
+                    if handle_results(keyword, results, category_descriptions[keyword]):
+                        break
+            finally:
+                # Don't start searches whose results are no longer needed
+                keyword_results.close()
+    
+    print(f"Total results written: {written}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,8 +1,10 @@
 import os
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 
 
 class FileDeduplicator:
@@ -11,14 +13,36 @@ class FileDeduplicator:
         self.folder_path = Path(folder_path)
         if not self.folder_path.exists():
             raise FileNotFoundError(f"Folder not found: {folder_path}")
+        self._files_cache = None
 
-    def find_files(self) -> List[Path]:
-        """Find all Excel and CSV files in the folder."""
-        return sorted(
-            [f for f in self.folder_path.glob("**/*") if f.suffix in ('.xls', '.xlsx', '.csv')],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        )
+    def find_files(self, refresh: bool = False) -> List[Path]:
+        """Find all Excel and CSV files in the folder, newest first (cached; refresh=True rescans)."""
+        if self._files_cache is None or refresh:
+            found = []
+            self._scan_folder(str(self.folder_path), found)
+            found.sort(key=itemgetter(0), reverse=True)
+            self._files_cache = [Path(path) for _, path in found]
+        return list(self._files_cache)
+
+    def _scan_folder(self, folder: str, found: List[Tuple[float, str]]) -> None:
+        """
+        Collect (mtime, path) for the Excel and CSV files under folder, in the
+        order Path.glob("**/*") visits them. One scandir per directory, and
+        only matching files are stat'ed.
+        """
+        try:
+            with os.scandir(folder) as entries:
+                entries = list(entries)
+        except PermissionError:
+            return
+        subfolders = []
+        for entry in entries:
+            if os.path.splitext(entry.name)[1] in ('.xls', '.xlsx', '.csv') and entry.is_file():
+                found.append((entry.stat().st_mtime, entry.path))
+            elif entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.path)
+        for subfolder in subfolders:
+            self._scan_folder(subfolder, found)
 
     def get_newest_file(self) -> Tuple[Path, List[Path]]:
         """Get the newest file and list of older files."""
@@ -27,24 +51,92 @@ class FileDeduplicator:
             raise FileNotFoundError("No Excel or CSV files found in the specified folder")
         return files[0], files[1:]
 
-    def load_and_combine_files(self, files: List[Path]) -> pd.DataFrame:
-        """Load and combine multiple Excel and CSV files into a single DataFrame."""
-        combined_data = pd.DataFrame()
-        for file in files:
-            try:
-                if file.suffix in ('.xls', '.xlsx'):
-                    xls = pd.ExcelFile(file)
+    def load_and_combine_files(self, files: List[Path], key_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load and combine multiple Excel and CSV files into a single DataFrame.
+        With key_columns, only those columns are parsed from each file.
+        """
+        # Files are read in threads (the C parsers release the GIL); map()
+        # keeps them in order, and errors are reported in that order too
+        frames = []
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as executor:
+            results = executor.map(lambda file: self._load_file(file, key_columns), files)
+            for file, (file_frames, error) in zip(files, results):
+                frames.extend(file_frames)
+                if error is not None:
+                    print(f"Error reading file {file}: {str(error)}")
+        # Concatenate once; concatenating inside the loop copies every earlier
+        # row again for each file
+        if not frames:
+            return pd.DataFrame()
+        combined_data = pd.concat(frames, ignore_index=True)
+        if key_columns is not None:
+            # Files read whole (no compare column) bring other columns along;
+            # only the keys are compared, so only they are deduplicated. With
+            # no key column at all, the frame is left for the usual error
+            present = [col for col in combined_data.columns if col in key_columns]
+            if present:
+                combined_data = combined_data[present]
+        return combined_data.drop_duplicates()
+
+    @staticmethod
+    def _load_file(file: Path, key_columns: Optional[List[str]] = None) -> Tuple[List[pd.DataFrame], Optional[Exception]]:
+        """Read the non-empty sheets of one file; also returns the error that stopped reading, if any."""
+        frames = []
+        try:
+            if file.suffix in ('.xls', '.xlsx'):
+                # Sheets are read from the already opened workbook, not by
+                # reopening and re-parsing the file for each one
+                with pd.ExcelFile(file) as xls:
                     for sheet_name in xls.sheet_names:
-                        df = pd.read_excel(file, sheet_name=sheet_name)
+                        df = FileDeduplicator._read_columns(pd.read_excel, key_columns, xls, sheet_name=sheet_name)
                         if not df.empty:
-                            combined_data = pd.concat([combined_data, df], ignore_index=True)
-                elif file.suffix == '.csv':
-                    df = pd.read_csv(file, low_memory=False)
-                    if not df.empty:
-                        combined_data = pd.concat([combined_data, df], ignore_index=True)
-            except Exception as e:
-                print(f"Error reading file {file}: {str(e)}")
-        return combined_data.drop_duplicates() if not combined_data.empty else combined_data
+                            frames.append(df)
+            elif file.suffix == '.csv':
+                df = FileDeduplicator._read_columns(pd.read_csv, key_columns, file, low_memory=False)
+                if not df.empty:
+                    frames.append(df)
+        except Exception as e:
+            return frames, e
+        return frames, None
+
+    @staticmethod
+    def _read_columns(read, key_columns: Optional[List[str]], *args, **kwargs) -> pd.DataFrame:
+        """Call a pandas reader parsing only key_columns (all columns when None)."""
+        if key_columns is None:
+            return read(*args, **kwargs)
+        df = read(*args, usecols=lambda col: col in key_columns, **kwargs)
+        if len(df.columns) == 0:
+            # None of the compare columns here; read it whole so its rows
+            # still count as blank keys, as they do when every column is loaded
+            df = read(*args, **kwargs)
+        return df
+
+    @staticmethod
+    def _resolve_key_columns(newest_file: Path, columns_to_compare: List[str]) -> Optional[List[str]]:
+        """
+        Names of the columns _process_dataframe will compare, read from the
+        newest file's header(s); None when they can't be known up front.
+        """
+        if columns_to_compare != ['B']:
+            return list(columns_to_compare)
+        try:
+            if newest_file.suffix in ('.xls', '.xlsx'):
+                headers = [df.columns for df in pd.read_excel(newest_file, sheet_name=None, nrows=0).values()]
+            elif newest_file.suffix == '.csv':
+                headers = [pd.read_csv(newest_file, nrows=0).columns]
+            else:
+                return None
+        except Exception:
+            return None
+        key_columns = []
+        for columns in headers:
+            if len(columns) < 2:
+                return None
+            # 'B' is the second column of each sheet
+            if columns[1] not in key_columns:
+                key_columns.append(columns[1])
+        return key_columns
 
     def process_newest_file(self, newest_file: Path, combined_data: pd.DataFrame, columns_to_compare: List[str]) -> Dict[str, Dict[str, int]]:
         """Process the newest file and remove duplicates. Returns statistics about removals."""
@@ -57,10 +149,9 @@ class FileDeduplicator:
 
             # Process file
             if newest_file.suffix in ('.xls', '.xlsx'):
-                xls = pd.ExcelFile(backup_path)
-                with pd.ExcelWriter(newest_file, engine='openpyxl') as writer:
+                with pd.ExcelFile(backup_path) as xls, pd.ExcelWriter(newest_file, engine='openpyxl') as writer:
                     for sheet_name in xls.sheet_names:
-                        df = pd.read_excel(backup_path, sheet_name=sheet_name)
+                        df = pd.read_excel(xls, sheet_name=sheet_name)
                         if not df.empty:
                             self._process_dataframe(df, combined_data, columns_to_compare, removal_stats, sheet_name, writer)
             elif newest_file.suffix == '.csv':
@@ -103,8 +194,7 @@ class FileDeduplicator:
 
         # Remove external duplicates
         if not combined_data.empty:
-            df_final = df_no_internal_dupes[~df_no_internal_dupes.set_index(columns_to_compare).index.isin(
-                combined_data.set_index(columns_to_compare).index)]
+            df_final = df_no_internal_dupes[~self._in_combined_data(df_no_internal_dupes, combined_data, columns_to_compare)]
             external_dupes_removed = len(df_no_internal_dupes) - len(df_final)
         else:
             df_final = df_no_internal_dupes
@@ -124,6 +214,21 @@ class FileDeduplicator:
             'remaining_rows': len(df_final)
         }
 
+    @staticmethod
+    def _in_combined_data(df: pd.DataFrame, combined_data: pd.DataFrame, columns_to_compare: List[str]):
+        """Boolean mask of the rows in df whose key columns also appear in combined_data."""
+        for col in columns_to_compare:
+            if col not in combined_data.columns:
+                raise ValueError(f"Column '{col}' not found in the older files.")
+
+        # Hash lookups on the key columns alone; set_index copied every
+        # column of both frames just to build the indexes
+        if len(columns_to_compare) == 1:
+            col = columns_to_compare[0]
+            return df[col].isin(combined_data[col]).to_numpy()
+        return pd.MultiIndex.from_frame(df[columns_to_compare]).isin(
+            pd.MultiIndex.from_frame(combined_data[columns_to_compare]))
+
     def _print_statistics(self, removal_stats: Dict):
         """Print detailed statistics."""
         print("\nDuplication Removal Statistics:")
@@ -140,12 +245,13 @@ class FileDeduplicator:
     def remove_duplicates(self) -> None:
         """Main method to handle the deduplication process."""
         try:
-            # Get files
+            # Get files (scanned once, reused below)
             newest_file, older_files = self.get_newest_file()
+            files = self.find_files()
 
             print(f"\nNewest file detected: {newest_file}")
             print("\nAll Excel and CSV files found (newest first):")
-            for i, file in enumerate(self.find_files(), 1):
+            for i, file in enumerate(files, 1):
                 print(f"{i}: {file}")
 
             choice = input("\nIs this the correct newest file? (yes/no/quit): ").strip().lower()
@@ -153,18 +259,22 @@ class FileDeduplicator:
                 return
             if choice in ['no', 'n']:
                 idx = int(input("\nEnter the number of the correct file: ")) - 1
-                files = self.find_files()
                 newest_file = files[idx]
                 older_files = [f for f in files if f != newest_file]
 
-            # Load and process files
-            print("\nLoading older files...")
-            combined_data = self.load_and_combine_files(older_files)
-            print(f"Found {len(combined_data)} unique rows in older files")
-
             # Use column 'B' by default
             columns_to_compare = ['B']
 
+            # Load and process files; only the compare columns are needed
+            # from the older files
+            print("\nLoading older files...")
+            key_columns = self._resolve_key_columns(newest_file, columns_to_compare)
+            combined_data = self.load_and_combine_files(older_files, key_columns)
+            if key_columns is None:
+                print(f"Found {len(combined_data)} unique rows in older files")
+            else:
+                print(f"Found {len(combined_data)} unique {', '.join(map(str, key_columns))} values in older files")
+
             print("\nProcessing newest file...")
             self.process_newest_file(newest_file, combined_data, columns_to_compare)
 
@@ -5,22 +5,66 @@ Fixes duplicate slugs in CSV files by appending product IDs to duplicate titles
 """
 
 import csv
-import re
 import sys
 import os
-from collections import defaultdict
+from collections import Counter
+from contextlib import nullcontext
+from itertools import islice
+from multiprocessing import Pool
 from pathlib import Path
 from datetime import datetime
 
 
+_SLUG_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+
+
+class _SlugTable(dict):
+    """
+    str.translate table that lowercases a character and keeps only a-z and
+    0-9, turning whitespace and dashes into spaces and dropping the rest.
+    Entries are filled in the first time each character is seen.
+    """
+    
+    def __missing__(self, codepoint):
+        kept = ''.join(
+            char if char in _SLUG_CHARS else ' ' if char.isspace() or char == '-' else ''
+            for char in chr(codepoint).lower()
+        )
+        self[codepoint] = kept
+        return kept
+
+
+_SLUG_TABLE = _SlugTable()
+
+# Inputs smaller than this (roughly 100k rows) are slugged in-process, where a
+# worker pool would cost more to start than it saves
+PARALLEL_MIN_BYTES = 20 * 1024 * 1024
+SLUG_CHUNK_ROWS = 10000
+
+
 def generate_slug(title):
     """Generate a slug from a title string."""
-    slug = title.lower()
-    slug = re.sub(r'[^a-z0-9\s-]', '', slug)
-    slug = re.sub(r'\s+', '-', slug)
-    slug = re.sub(r'-+', '-', slug)
-    slug = slug.strip('-')
-    return slug
+    # Dropped characters join their neighbours; runs of whitespace and dashes
+    # collapse into a single dash, with none left at either end.
+    return '-'.join(title.translate(_SLUG_TABLE).split())
+
+
+def _slugged_rows(reader, pool=None):
+    """Yield (row, slug) pairs, with slug None for rows without a title."""
+    if pool is None:
+        for row in reader:
+            yield row, generate_slug(row[1]) if len(row) > 1 else None
+        return
+    
+    # Slug one chunk at a time across the pool so rows still stream through
+    while True:
+        chunk = list(islice(reader, SLUG_CHUNK_ROWS))
+        if not chunk:
+            return
+        titles = [row[1] for row in chunk if len(row) > 1]
+        slugs = iter(pool.map(generate_slug, titles, chunksize=1000))
+        for row in chunk:
+            yield row, next(slugs) if len(row) > 1 else None
 
 
 def find_and_fix_duplicates(input_file, output_file=None, backup=True):
@@ -53,10 +97,15 @@ def find_and_fix_duplicates(input_file, output_file=None, backup=True):
         import shutil
         shutil.copy2(input_path, backup_file)
     
+    # Writing over the input itself goes through a temporary file, since rows
+    # are streamed out while the input is still being read
+    in_place = output_file.exists() and os.path.samefile(input_path, output_file)
+    write_path = output_file.with_name(f"{output_file.name}.tmp") if in_place else output_file
+    use_pool = (os.cpu_count() or 1) > 1 and input_path.stat().st_size >= PARALLEL_MIN_BYTES
+    
     # Read CSV and process
-    rows = []
-    slug_count = defaultdict(int)
-    slug_to_products = defaultdict(list)
+    first_products = {}  # slug -> first (product_id, title), in first-seen order
+    dup_count = Counter()  # slug -> occurrences after the first
     duplicates_fixed = []
     
     print(f"Reading CSV file: {input_file}")
@@ -64,45 +113,46 @@ def find_and_fix_duplicates(input_file, output_file=None, backup=True):
     with open(input_path, 'r', encoding='utf-8') as f:
         reader = csv.reader(f)
         header = next(reader)
-        rows.append(header)
         
-        row_count = 0
-        for row in reader:
-            row_count += 1
-            if len(row) > 1:
-                product_id = row[0]
-                title = row[1]
-                slug = generate_slug(title)
-                
-                slug_count[slug] += 1
-                slug_to_products[slug].append((product_id, title))
-                
-                # If this slug has been seen before, modify the title
-                if slug_count[slug] > 1:
-                    # Add product ID to title to make it unique
-                    new_title = f"{title} - {product_id}"
-                    row[1] = new_title
-                    duplicates_fixed.append({
-                        'product_id': product_id,
-                        'original_title': title,
-                        'new_title': new_title,
-                        'slug': slug,
-                        'occurrence': slug_count[slug]
-                    })
-                    print(f"  Fixed duplicate #{len(duplicates_fixed)}: {title[:50]}... -> ...{product_id}")
-                
-                rows.append(row)
-    
-    # Write fixed CSV
-    print(f"\nWriting fixed CSV to: {output_file}")
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
+        print(f"Writing fixed CSV to: {output_file}")
+        with open(write_path, 'w', encoding='utf-8', newline='') as out, \
+                (Pool() if use_pool else nullcontext()) as pool:
+            writer = csv.writer(out)
+            writer.writerow(header)
+            
+            row_count = 0
+            for row, slug in _slugged_rows(reader, pool):
+                row_count += 1
+                if slug is not None:
+                    product_id = row[0]
+                    title = row[1]
+                    
+                    # If this slug has been seen before, modify the title
+                    if slug in first_products:
+                        dup_count[slug] += 1
+                        # Add product ID to title to make it unique
+                        new_title = f"{title} - {product_id}"
+                        row[1] = new_title
+                        duplicates_fixed.append({
+                            'product_id': product_id,
+                            'original_title': title,
+                            'new_title': new_title,
+                            'slug': slug,
+                            'occurrence': dup_count[slug] + 1
+                        })
+                        print(f"  Fixed duplicate #{len(duplicates_fixed)}: {title[:50]}... -> ...{product_id}")
+                    else:
+                        first_products[slug] = (product_id, title)
+                    
+                    writer.writerow(row)
+    
+    if in_place:
+        os.replace(write_path, output_file)
     
     # Prepare statistics
-    total_unique_slugs = len(slug_count)
-    duplicate_slugs = [slug for slug, count in slug_count.items() if count > 1]
-    total_duplicate_occurrences = sum(count - 1 for count in slug_count.values() if count > 1)
+    total_unique_slugs = len(first_products)
+    duplicate_slugs = [slug for slug in first_products if slug in dup_count]
+    total_duplicate_occurrences = sum(dup_count.values())
     
     stats = {
         'total_rows': row_count,
@@ -129,18 +179,24 @@ def find_and_fix_duplicates(input_file, output_file=None, backup=True):
         print("-"*60)
         
         sorted_duplicates = sorted(
-            [(slug, count) for slug, count in slug_count.items() if count > 1],
+            [(slug, dup_count[slug] + 1) for slug in duplicate_slugs],
             key=lambda x: x[1],
             reverse=True
         )[:10]
         
+        # First 3 products of each listed slug: the original, then its fixes
+        samples = {slug: [first_products[slug]] for slug, _ in sorted_duplicates}
+        for fix in duplicates_fixed:
+            products = samples.get(fix['slug'])
+            if products is not None and len(products) < 3:
+                products.append((fix['product_id'], fix['original_title']))
+        
         for slug, count in sorted_duplicates:
             print(f"  {count}x: {slug[:60]}...")
-            products = slug_to_products[slug][:3]  # Show first 3 products
-            for pid, title in products:
+            for pid, title in samples[slug]:
                 print(f"      - ID: {pid}, Title: {title[:50]}...")
-            if len(slug_to_products[slug]) > 3:
-                print(f"      ... and {len(slug_to_products[slug]) - 3} more")
+            if count > 3:
+                print(f"      ... and {count - 3} more")
     
     # Write detailed report
     report_file = output_file.parent / f"{output_file.stem}_report.txt"
@@ -158,12 +214,14 @@ def find_and_fix_duplicates(input_file, output_file=None, backup=True):
         
         f.write("\n\nDUPLICATES FIXED:\n")
         f.write("-"*40 + "\n")
-        for fix in duplicates_fixed:
-            f.write(f"\nProduct ID: {fix['product_id']}\n")
-            f.write(f"Original: {fix['original_title']}\n")
-            f.write(f"Modified: {fix['new_title']}\n")
-            f.write(f"Slug: {fix['slug']}\n")
-            f.write(f"Occurrence #: {fix['occurrence']}\n")
+        f.write(''.join(
+            f"\nProduct ID: {fix['product_id']}\n"
+            f"Original: {fix['original_title']}\n"
+            f"Modified: {fix['new_title']}\n"
+            f"Slug: {fix['slug']}\n"
+            f"Occurrence #: {fix['occurrence']}\n"
+            for fix in duplicates_fixed
+        ))
     
     return stats
 